@@ -1,105 +1,21 @@
 import sys
-import pandas as pd
-from PyQt5.QtWidgets import QApplication, QMainWindow, QLabel, QLineEdit, QPushButton, QVBoxLayout, QWidget, QTextEdit
-import datetime
-from sklearn.linear_model import LinearRegression
-import numpy as np
+import time
 
-# 데이터 로드 및 전처리
-def load_and_preprocess_data(file_path):
-    all_data = {}
-    for year in ['2019', '2020', '2021', '2022', '2023']:
-        df = pd.read_excel(file_path, sheet_name=year)
-        # 데이터 전처리: 2019-2022년의 "교외활동"을 "교외"로 변경
-        if year in ['2019', '2020', '2021', '2022']:
-            df['사고장소'] = df['사고장소'].replace('교외활동', '교외')
-        all_data[year] = df
-    
-    return all_data
-
-# 특정 시간대 사고 수 계산 및 장소별 비율 계산
-def get_accident_counts_and_place_distribution(data, region, day, start_hour, end_hour):
-    counts = {}
-    place_distribution = {}
-    place_counts_total = {}
-    places = ['교실', '교외', '부속시설', '운동장', '통로']
-
-    for year, df in data.items():
-        # DataFrame의 사본을 생성하여 원본을 변경하지 않음
-        df_copy = df.copy()
-        
-        # 사고발생시각을 datetime 형식으로 변환하고 시간 추출
-        try:
-            df_copy['사고발생시각'] = pd.to_datetime(df_copy['사고발생시각'], format='%H:%M', errors='coerce').dt.hour
-        except Exception as e:
-            print(f"Error processing 사고발생시각 in year {year}: {e}")
-            continue
-
-        # 해당 지역, 요일 및 시간대 필터링
-        filtered_df = df_copy[(df_copy['지역'] == region) & (df_copy['사고발생요일'] == day) & (df_copy['사고발생시각'] >= start_hour) & (df_copy['사고발생시각'] < end_hour)]
-        
-        # 사고 수 계산
-        counts[year] = len(filtered_df)
-        
-        # 사고 장소별 비율 및 횟수 계산
-        place_counts = filtered_df['사고장소'].value_counts()
-        total = place_counts.sum()
-        place_counts_total[year] = place_counts.to_dict()
-        if total > 0:
-            place_distribution[year] = {place: (place_counts.get(place, 0) / total) * 100 for place in places}
-        else:
-            place_distribution[year] = {place: 0 for place in places}
-    
-    return counts, place_distribution, place_counts_total
-
-# 선형 회귀를 이용한 사고 장소별 2024년 사고 수 예측
-def predict_accidents_by_place(data, region, day, start_hour, end_hour):
-    place_counts_by_year = {place: [] for place in ['교실', '교외', '부속시설', '운동장', '통로']}
-    years = []
+# 프로그램 시작 시각 (시작 시간 측정용, PyQt5 import 전)
+START_TIME = time.perf_counter()
 
-    for year, df in data.items():
-        # DataFrame의 사본을 생성하여 원본을 변경하지 않음
-        df_copy = df.copy()
-        
-        # 사고발생시각을 datetime 형식으로 변환하고 시간 추출
-        try:
-            df_copy['사고발생시각'] = pd.to_datetime(df_copy['사고발생시각'], format='%H:%M', errors='coerce').dt.hour
-        except Exception as e:
-            print(f"Error processing 사고발생시각 in year {year}: {e}")
-            continue
+from PyQt5.QtCore import QTimer
+from PyQt5.QtWidgets import QApplication, QMainWindow, QLabel, QLineEdit, QPushButton, QFileDialog, QVBoxLayout, QWidget, QTextEdit
+from query_runner import QueryRunner, StartupTimer, load_accident_data
 
-        # 해당 지역, 요일 및 시간대 필터링
-        filtered_df = df_copy[(df_copy['지역'] == region) & (df_copy['사고발생요일'] == day) & (df_copy['사고발생시각'] >= start_hour) & (df_copy['사고발생시각'] < end_hour)]
-        
-        # 사고 장소별 사고 수 계산
-        place_counts = filtered_df['사고장소'].value_counts()
-        for place in place_counts_by_year.keys():
-            place_counts_by_year[place].append(place_counts.get(place, 0))
-        
-        years.append(int(year))
-    
-    # 선형 회귀 모델 학습 및 2024년 예측
-    predicted_counts_2024 = {}
-    X = np.array(years).reshape(-1, 1)
-    for place, counts in place_counts_by_year.items():
-        if len(counts) == len(years):
-            y = np.array(counts)
-            model = LinearRegression().fit(X, y)
-            predicted_counts_2024[place] = model.predict(np.array([[2024]]))[0]
-        else:
-            predicted_counts_2024[place] = 0
-
-    total_predicted_count = sum(predicted_counts_2024.values())
-    predicted_percentage_2024 = {place: (count / total_predicted_count) * 100 if total_predicted_count > 0 else 0 for place, count in predicted_counts_2024.items()}
-
-    return predicted_counts_2024, total_predicted_count, predicted_percentage_2024
 
 # PyQt GUI
 class MainWindow(QMainWindow):
-    def __init__(self, data):
+    def __init__(self, data=None):
         super().__init__()
         
         self.data = data
+        self.runner = QueryRunner(self)
         
         self.setWindowTitle("지역별 학교 안전사고 수")
         
@@ -114,6 +30,7 @@ class MainWindow(QMainWindow):
         self.end_hour_label = QLabel("종료 시간 (1-24):")
         self.end_hour_input = QLineEdit()
         self.predict_button = QPushButton("사고 수 확인")
+        self.append_button = QPushButton("데이터 추가")
         self.result_label = QTextEdit()
         
         self.layout.addWidget(self.region_label)
@@ -125,22 +42,95 @@ class MainWindow(QMainWindow):
         self.layout.addWidget(self.end_hour_label)
         self.layout.addWidget(self.end_hour_input)
         self.layout.addWidget(self.predict_button)
+        self.layout.addWidget(self.append_button)
         self.layout.addWidget(self.result_label)
         
         self.predict_button.clicked.connect(self.show_accident_counts)
+        self.append_button.clicked.connect(self.append_data)
+        self.has_result = False
+        self.startup = StartupTimer(START_TIME)
+        
+        # 데이터가 로드될 때까지 조회 및 추가 버튼을 끔
+        self.set_buttons_enabled(data is not None)
         
         container = QWidget()
         container.setLayout(self.layout)
         self.setCentralWidget(container)
     
     def show_accident_counts(self):
+        from queries import get_accident_counts_and_place_distribution, predict_accidents_by_place_windows
+        
         region = self.region_input.text()
         day = self.day_input.text()
         start_hour = int(self.start_hour_input.text())
         end_hour = int(self.end_hour_input.text())
         
-        counts, place_distribution, place_counts_total = get_accident_counts_and_place_distribution(self.data, region, day, start_hour, end_hour)
-        predicted_counts_2024, total_predicted_count, predicted_percentage_2024 = predict_accidents_by_place(self.data, region, day, start_hour, end_hour)
+        # 선택한 시간대와 TEST용 1시간 단위 시간대를 한 번에 예측
+        hourly_windows = [(i, i + 1) for i in range(start_hour, 24)]
+        
+        # 계산은 작업 스레드에서 실행하고 결과는 UI 스레드에서 표시 (새 조회를 시작하면 이전 조회는 취소)
+        self.statusBar().showMessage("조회 중...")
+        self.runner.submit(
+            [('사고 수 및 장소별 비율 계산', lambda: get_accident_counts_and_place_distribution(self.data, region, day, start_hour, end_hour)),
+             (f'{self.data.forecast_year}년 사고 수 예측', lambda: predict_accidents_by_place_windows(self.data, region, day, [(start_hour, end_hour)] + hourly_windows))],
+            lambda results: self.render_accident_counts(region, day, start_hour, end_hour, hourly_windows, *results),
+            self.show_progress, self.show_error)
+    
+    # 데이터를 작업 스레드에서 로드 (창을 먼저 표시하고 pandas 등 무거운 모듈은 이때 import)
+    def load_data(self, file_path):
+        self.statusBar().showMessage("데이터 로드 중...")
+        self.runner.submit(
+            [('데이터 로드', lambda: load_accident_data(file_path))],
+            lambda results: self.set_data(*results),
+            self.show_progress, lambda message: self.statusBar().showMessage(f"데이터 로드 실패: {message}"))
+    
+    def set_data(self, data):
+        self.data = data
+        self.set_buttons_enabled(True)
+        self.statusBar().showMessage(f"데이터 로드 완료 ({', '.join(data.years)}년)")
+        self.startup.mark('조회 가능')
+    
+    # 선택한 워크북의 행을 작업 스레드에서 로드된 데이터에 추가하고, 표시 중인 결과가 있으면 다시 조회
+    def append_data(self):
+        file_path, _ = QFileDialog.getOpenFileName(self, "추가할 데이터 선택", "", "Excel 파일 (*.xlsx)")
+        if not file_path:
+            return
+        
+        # 추가가 끝날 때까지 버튼을 꺼서 추가 중 새 조회나 두 번째 추가로 추가 작업이 취소되지 않도록 함
+        self.set_buttons_enabled(False)
+        self.statusBar().showMessage("데이터 추가 중...")
+        self.runner.submit(
+            [('데이터 추가', lambda: self.data.append_workbook(file_path))],
+            lambda results: self.refresh(),
+            self.show_progress, self.append_failed)
+    
+    def append_failed(self, message):
+        self.set_buttons_enabled(True)
+        self.statusBar().showMessage(f"데이터 추가 실패: {message}")
+    
+    def refresh(self):
+        self.set_buttons_enabled(True)
+        if self.has_result:
+            self.show_accident_counts()
+        else:
+            self.statusBar().showMessage(f"데이터 추가 완료 ({', '.join(self.data.years)}년)")
+    
+    def set_buttons_enabled(self, enabled):
+        self.predict_button.setEnabled(enabled)
+        self.append_button.setEnabled(enabled)
+    
+    def show_progress(self, step, total, label):
+        self.statusBar().showMessage(f"{label} ({step + 1}/{total})")
+    
+    def show_error(self, message):
+        self.statusBar().showMessage(f"조회 실패: {message}")
+    
+    def render_accident_counts(self, region, day, start_hour, end_hour, hourly_windows, query, forecasts):
+        counts, place_distribution, place_counts_total = query
+        self.statusBar().showMessage(self.data.result_cache.summary())
+        self.has_result = True
+        self.startup.mark('첫 조회 결과 표시')
+        predicted_counts, total_predicted_count, predicted_percentage = forecasts[0]
         
         result_text = f"{region} 지역에서 {day}요일 {start_hour}시부터 {end_hour}시까지의 사고 수:\n"
         for year, count in counts.items():
@@ -153,19 +143,18 @@ class MainWindow(QMainWindow):
                 count = place_counts_total[year].get(place, 0)
                 result_text += f"  {place}: {count}건 ({percentage:.2f}%)\n"
         
-        result_text += f"\n2024년 {day}요일에 예측된 사고 수:\n"
-        for place, count in predicted_counts_2024.items():
-            percentage = predicted_percentage_2024[place]
+        result_text += f"\n{self.data.forecast_year}년 {day}요일에 예측된 사고 수:\n"
+        for place, count in predicted_counts.items():
+            percentage = predicted_percentage[place]
             result_text += f"  {place}: {count:.2f}건 ({percentage:.2f}%)\n"
         result_text += f"\n총 예측 사고 수: {total_predicted_count:.2f}건\n"
         
         # 여기서부터는 두회의 테스트
         result_text += f"\n--------------TEST--------------\n"
-        for i in range(start_hour,24,1):
-            predicted_counts_2024, total_predicted_count, predicted_percentage_2024 = predict_accidents_by_place(self.data, region, day, i, i+1)
-            result_text += f"\n2024년 {day}요일 {i}~{i+1}에 예측된 사고 수:\n"
-            for place, count in predicted_counts_2024.items():
-                percentage = predicted_percentage_2024[place]
+        for (i, _), (predicted_counts, total_predicted_count, predicted_percentage) in zip(hourly_windows, forecasts[1:]):
+            result_text += f"\n{self.data.forecast_year}년 {day}요일 {i}~{i+1}에 예측된 사고 수:\n"
+            for place, count in predicted_counts.items():
+                percentage = predicted_percentage[place]
                 result_text += f"  {place}: {count:.2f}건 ({percentage:.2f}%)\n"
             result_text += f"\n총 예측 사고 수: {total_predicted_count:.2f}건\n"
         
@@ -177,9 +166,11 @@ class MainWindow(QMainWindow):
 
 if __name__ == '__main__':
     file_path = 'schoolData.xlsx'
-    data = load_and_preprocess_data(file_path)
     
     app = QApplication(sys.argv)
-    window = MainWindow(data)
+    window = MainWindow()
     window.show()
+    # 창을 먼저 표시하고 데이터는 작업 스레드에서 로드
+    QTimer.singleShot(0, lambda: window.startup.mark('첫 화면 표시'))
+    window.load_data(file_path)
     sys.exit(app.exec_())
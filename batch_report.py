@@ -0,0 +1,79 @@
+import os
+import sys
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+from school_data import PLACES, DAYS, AccidentData, load_and_preprocess_data
+from queries import get_accident_counts_and_place_distribution, predict_accidents_by_place_windows
+
+# 보고서 컬럼: 구분이 '실적'이면 연도별 사고 수(정수)/비율, '예측'이면 다음 해 예측 사고 수(실수)/비율
+# 실적과 예측 사고 수는 타입이 달라 별도 컬럼에 두고, 해당하지 않는 행은 빈 칸
+REPORT_COLUMNS = ['지역', '요일', '시작시간', '종료시간', '연도', '구분', '사고장소', '사고수', '예측사고수', '비율']
+
+# 작업 프로세스마다 한 번 만드는 사고 데이터
+worker_data = None
+
+# 작업 프로세스 초기화: 메인 프로세스에서 만든 사고 수 텐서를 그대로 사용 (행 단위 데이터는 보내지 않고, 조회가 모두 달라 결과 캐시는 사용하지 않음)
+def init_worker(cube):
+    global worker_data
+    worker_data = AccidentData(result_cache_bytes=0, cube=cube)
+
+# 한 지역의 모든 요일 × 시간대 보고서 행과 조회 수
+def region_report(region, days, hour_windows):
+    data = worker_data
+    rows = []
+    for day in days:
+        forecasts = predict_accidents_by_place_windows(data, region, day, hour_windows)
+        for (start_hour, end_hour), (predicted_counts, _, predicted_percentage) in zip(hour_windows, forecasts):
+            _, place_distribution, place_counts_total = get_accident_counts_and_place_distribution(data, region, day, start_hour, end_hour)
+            for year in data.years:
+                for place in PLACES:
+                    rows.append((region, day, start_hour, end_hour, year, '실적', place, place_counts_total[year].get(place, 0), None, place_distribution[year][place]))
+            for place in PLACES:
+                rows.append((region, day, start_hour, end_hour, str(data.forecast_year), '예측', place, None, predicted_counts[place], predicted_percentage[place]))
+    return rows, len(days) * len(hour_windows)
+
+# 확장자에 따라 Parquet 또는 CSV로 저장 (CSV는 엑셀에서 한글이 깨지지 않도록 BOM 포함)
+def write_report(report, output_path):
+    if output_path.endswith('.parquet'):
+        report.to_parquet(output_path, index=False)
+    else:
+        report.to_csv(output_path, index=False, encoding='utf-8-sig')
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="모든 지역 × 요일 × 시간대의 사고 수, 장소별 비율 및 예측 보고서 생성 (GUI 없이 실행)")
+    parser.add_argument('file_path', nargs='?', default='schoolData.xlsx', help="사고 데이터 엑셀 파일")
+    parser.add_argument('-o', '--output', default='report.parquet', help="결과 파일 (.parquet 또는 .csv)")
+    parser.add_argument('--window-hours', type=int, default=1, help="시간대 길이 (1-24시간)")
+    parser.add_argument('--workers', type=int, default=None, help="작업 프로세스 수 (기본: CPU 수)")
+    parser.add_argument('--chunk-size', type=int, default=None, help="시트를 이 행 수씩 읽어 집계 (메모리보다 큰 워크북용)")
+    args = parser.parse_args(argv)
+    if not 1 <= args.window_hours <= 24:
+        parser.error("--window-hours는 1에서 24 사이여야 합니다")
+
+    data = load_and_preprocess_data(args.file_path, chunk_size=args.chunk_size)
+    regions = data.cube.regions
+    hour_windows = [(hour, min(hour + args.window_hours, 24)) for hour in range(0, 24, args.window_hours)]
+    workers = args.workers or os.cpu_count() or 1
+
+    # 지역별로 작업을 나누어 프로세스 풀에서 실행
+    start_time = time.perf_counter()
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(data.cube,)) as executor:
+            results = list(executor.map(region_report, regions, [DAYS] * len(regions), [hour_windows] * len(regions)))
+    else:
+        init_worker(data.cube)
+        results = [region_report(region, DAYS, hour_windows) for region in regions]
+    elapsed = time.perf_counter() - start_time
+
+    report = pd.DataFrame([row for rows, _ in results for row in rows], columns=REPORT_COLUMNS)
+    report['사고수'] = report['사고수'].astype('Int64')
+    report['예측사고수'] = report['예측사고수'].astype('float64')
+    write_report(report, args.output)
+
+    query_count = sum(count for _, count in results)
+    print(f"조회 {query_count}건 완료: {elapsed:.2f}초 ({query_count / elapsed:.0f}건/초, 프로세스 {workers}개) -> {args.output}")
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
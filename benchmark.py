@@ -0,0 +1,254 @@
+import os
+import sys
+import json
+import time
+import argparse
+import datetime
+import platform
+import tempfile
+import subprocess
+import tracemalloc
+import numpy as np
+import pandas as pd
+from openpyxl import Workbook
+from school_data import PLACES, DAYS, AccidentData, ResultCache, add_time_columns, combine_frames, compact_frames, forecast_linear, load_and_preprocess_data, read_workbook, read_workbook_chunked
+import queries
+
+YEARS = ['2019', '2020', '2021', '2022', '2023']
+REGIONS = ['서울', '부산', '대구', '인천', '광주', '대전', '울산', '세종', '경기',
+           '강원', '충북', '충남', '전북', '전남', '경북', '경남', '제주']
+# 엑셀 시트 하나에 들어가는 데이터 행 수 (머리글 제외)
+SHEET_MAX_ROWS = 1_048_575
+SUITE_ROWS = [10_000, 100_000, 1_000_000]
+
+# schoolData.xlsx와 같은 컬럼 구성의 가상 데이터 생성 (연도별 rows_per_year행)
+def make_synthetic_data(rows_per_year, seed=0, years=YEARS):
+    rng = np.random.default_rng(seed)
+    all_data = {}
+    for year in years:
+        hours = pd.Series(rng.integers(0, 24, rows_per_year)).astype(str).str.zfill(2)
+        minutes = pd.Series(rng.integers(0, 60, rows_per_year)).astype(str).str.zfill(2)
+        all_data[year] = pd.DataFrame({
+            '지역': rng.choice(REGIONS, rows_per_year),
+            '사고발생요일': rng.choice(DAYS, rows_per_year),
+            '사고발생시각': hours + ':' + minutes,
+            '사고장소': rng.choice(PLACES, rows_per_year),
+        })
+    return all_data
+
+# 변경 전 방식: 연도마다 사본 생성 및 시각 파싱 후 요일마다 다시 필터링
+def legacy_day_breakdown(all_data, region, start_hour, end_hour):
+    day_distribution = {}
+    for year, df in all_data.items():
+        df_copy = df.copy()
+        df_copy['사고발생시각'] = pd.to_datetime(df_copy['사고발생시각'], format='%H:%M', errors='coerce').dt.hour
+        filtered_df = df_copy[(df_copy['지역'] == region) & (df_copy['사고발생시각'] >= start_hour) & (df_copy['사고발생시각'] < end_hour)]
+        day_distribution[year] = {}
+        for day in DAYS:
+            day_df = filtered_df[filtered_df['사고발생요일'] == day]
+            day_distribution[year][day] = day_df['사고장소'].value_counts()
+    return day_distribution
+
+# 여러 번 실행한 것 중 가장 짧은 시간(초)
+def time_call(func, *args, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start_time)
+    return best
+
+# 요일별 분포 계산: 변경 전 필터링 방식과 사고 수 텐서 방식 비교
+def benchmark_day_breakdown(row_counts):
+    print(f"{'연도별 행 수':>12} {'기존(ms)':>10} {'텐서 생성(ms)':>14} {'조회(ms)':>10} {'속도 향상':>10}")
+    for rows in row_counts:
+        raw = make_synthetic_data(rows)
+        legacy = time_call(legacy_day_breakdown, raw, '서울', 9, 18)
+
+        frame = combine_frames(compact_frames({year: add_time_columns(df.copy(), year) for year, df in raw.items()}))
+        build = time_call(AccidentData, frame)
+        data = AccidentData(frame)
+        # 결과 캐시를 거치지 않은 계산 시간
+        query = time_call(queries.get_daily_accident_counts_and_place_distribution.__wrapped__, data, '서울', 9, 18)
+
+        print(f"{rows:>12,} {legacy * 1000:>10.2f} {build * 1000:>14.2f} {query * 1000:>10.3f} {legacy / query:>9.0f}x")
+
+# 사고 수 텐서의 모든 시계열(지역 × 요일 × 시간 × 장소) 예측: 시계열별 LinearRegression과 일괄 최소제곱 비교
+def benchmark_forecast(rows):
+    from sklearn.linear_model import LinearRegression
+
+    raw = make_synthetic_data(rows)
+    data = AccidentData(combine_frames(compact_frames({year: add_time_columns(df.copy(), year) for year, df in raw.items()})))
+    years = [int(year) for year in data.years]
+    series = data.cube.counts.reshape(len(years), -1)
+
+    def sklearn_forecast():
+        X = np.array(years).reshape(-1, 1)
+        return np.array([LinearRegression().fit(X, series[:, j]).predict([[data.forecast_year]])[0] for j in range(series.shape[1])])
+
+    expected = sklearn_forecast()
+    assert np.allclose(forecast_linear(years, series, data.forecast_year), expected)
+
+    legacy = time_call(sklearn_forecast, repeat=1)
+    batched = time_call(forecast_linear, years, series, data.forecast_year)
+    print(f"\n시계열 {series.shape[1]:,}개 예측: LinearRegression {legacy * 1000:.0f}ms, 일괄 {batched * 1000:.2f}ms ({legacy / batched:.0f}x)")
+
+# 함수 실행 중 최대 메모리 할당량(MB)
+# (SCHOOL_PROFILE=1로 이미 추적 중이면 추적을 멈추지 않고 최대값만 초기화)
+def peak_memory_mb(func, *args):
+    tracing = tracemalloc.is_tracing()
+    if not tracing:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    start = tracemalloc.get_traced_memory()[0]
+    try:
+        func(*args)
+        return (tracemalloc.get_traced_memory()[1] - start) / 1024 ** 2
+    finally:
+        if not tracing:
+            tracemalloc.stop()
+
+# make_synthetic_data와 같은 분포의 가상 워크북을 연도 시트마다 chunk_size행씩 생성하며 기록 (전체를 메모리에 두지 않음)
+def write_synthetic_workbook(file_path, rows_per_year, years, seed=0, chunk_size=100_000):
+    rng = np.random.default_rng(seed)
+    book = Workbook(write_only=True)
+    for year in years:
+        sheet = book.create_sheet(year)
+        sheet.append(['지역', '사고발생요일', '사고발생시각', '사고장소'])
+        for start in range(0, rows_per_year, chunk_size):
+            rows = min(chunk_size, rows_per_year - start)
+            times = [f'{hour:02d}:{minute:02d}' for hour, minute in zip(rng.integers(0, 24, rows), rng.integers(0, 60, rows))]
+            for row in zip(rng.choice(REGIONS, rows), rng.choice(DAYS, rows), times, rng.choice(PLACES, rows)):
+                sheet.append(row)
+    book.save(file_path)
+
+# 연도 시트 year_count개의 가상 워크북 로드: 한 프로세스에서 차례로 읽기와 프로세스 풀 비교
+def benchmark_workbook(rows, year_count=10):
+    years = [str(2024 - year_count + i) for i in range(year_count)]
+    workers = min(year_count, os.cpu_count() or 1)
+    with tempfile.TemporaryDirectory() as tmp:
+        file_path = os.path.join(tmp, 'schoolData.xlsx')
+        write_synthetic_workbook(file_path, rows, years)
+
+        sequential = time_call(read_workbook, file_path, 1, repeat=1)
+        parallel = time_call(read_workbook, file_path, workers, repeat=1)
+        # 시트 전체를 읽는 방식과 chunk_size행씩 읽어 바로 집계하는 방식의 최대 메모리
+        chunk_size = 10_000
+        in_memory_peak = peak_memory_mb(read_workbook, file_path, 1)
+        chunked_peak = peak_memory_mb(read_workbook_chunked, file_path, chunk_size)
+    print(f"\n연도 시트 {year_count}개 x {rows:,}행 로드: 순차 {sequential:.2f}초, 프로세스 {workers}개 {parallel:.2f}초 ({sequential / parallel:.1f}x)")
+    print(f"최대 메모리: 전체 로드 {in_memory_peak:.1f}MB, {chunk_size:,}행 단위 스트리밍 {chunked_peak:.1f}MB")
+
+# 결과를 기록할 커밋 (작업 트리에 변경이 있으면 -dirty)
+def current_commit():
+    try:
+        return subprocess.run(['git', 'describe', '--always', '--dirty'], capture_output=True, text=True, check=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+# 총 rows행의 가상 워크북으로 로드, 조회, 예측 함수 각각의 시간 측정
+# 반환: [(모듈, 이름, 초), ...] (모듈은 해당 함수를 사용하는 GUI)
+def measure_workbook(rows, repeat=3, chunk_size=100_000):
+    # 시트당 엑셀 행 수 제한을 넘지 않도록 연도 시트 수를 늘림
+    year_count = max(len(YEARS), -(-rows // SHEET_MAX_ROWS))
+    years = [str(int(YEARS[-1]) - year_count + 1 + i) for i in range(year_count)]
+    region, day, start_hour, end_hour = REGIONS[0], DAYS[0], 9, 18
+    hour_windows = [(start_hour, end_hour)] + [(hour, hour + 1) for hour in range(start_hour, 24)]
+    results = []
+
+    with tempfile.TemporaryDirectory() as tmp:
+        file_path = os.path.join(tmp, 'schoolData.xlsx')
+        start_time = time.perf_counter()
+        write_synthetic_workbook(file_path, rows // year_count, years)
+        print(f"가상 워크북 생성 ({rows:,}행, 연도 시트 {year_count}개): {time.perf_counter() - start_time:.1f}초")
+
+        results.append(('school_data', 'load_and_preprocess_data', time_call(load_and_preprocess_data, file_path, False, repeat=1)))
+        results.append(('school_data', f'load_and_preprocess_data[chunk_size={chunk_size}]',
+                        time_call(lambda: load_and_preprocess_data(file_path, False, chunk_size=chunk_size), repeat=1)))
+        data = load_and_preprocess_data(file_path)
+        results.append(('school_data', 'load_and_preprocess_data[cache]', time_call(load_and_preprocess_data, file_path, repeat=repeat)))
+
+    frame = data.frame.reset_index()
+    results.append(('school_data', 'AccidentData', time_call(AccidentData, frame, repeat=repeat)))
+    del frame
+
+    calls = [
+        ('school', 'get_daily_accident_counts_and_place_distribution',
+         lambda: queries.get_daily_accident_counts_and_place_distribution(data, region, start_hour, end_hour)),
+        ('analysis', 'get_accident_counts_and_place_distribution',
+         lambda: queries.get_accident_counts_and_place_distribution(data, region, day, start_hour, end_hour)),
+        ('analysis', 'predict_accidents_by_place',
+         lambda: queries.predict_accidents_by_place(data, region, day, start_hour, end_hour)),
+        ('analysis', 'predict_accidents_by_place_windows',
+         lambda: queries.predict_accidents_by_place_windows(data, region, day, hour_windows)),
+        ('dashboard', 'get_hourly_accident_counts_and_place_distribution',
+         lambda: queries.get_hourly_accident_counts_and_place_distribution(data, region, start_hour, day)),
+        ('queries', 'compare_regions',
+         lambda: queries.compare_regions(data, day, start_hour, end_hour)),
+    ]
+    counts, _ = queries.get_hourly_accident_counts_and_place_distribution(data, region, start_hour, day)
+    calls.append(('dashboard', 'predict_next_year_accidents', lambda: queries.predict_next_year_accidents(counts)))
+
+    # 결과 캐시 없이 계산한 시간과 캐시 적중 시간
+    data.result_cache = ResultCache(0)
+    for module, name, call in calls:
+        results.append((module, name, time_call(call, repeat=repeat)))
+    data.result_cache = ResultCache()
+    for module, name, call in calls:
+        if name not in ('predict_next_year_accidents', 'compare_regions'):
+            call()
+            results.append((module, f'{name}[cache]', time_call(call, repeat=repeat)))
+    return results
+
+# 같은 (행 수, 이름)의 이전 커밋 결과 중 가장 최근 값
+def previous_results(output_path, commit):
+    previous = {}
+    if os.path.exists(output_path):
+        with open(output_path, encoding='utf-8') as f:
+            for line in f:
+                record = json.loads(line)
+                if record['commit'] != commit:
+                    previous[record['rows'], record['name']] = record['seconds']
+    return previous
+
+# 행 수마다 측정하여 한 줄에 하나씩 JSON으로 output_path에 추가하고 이전 커밋 대비 변화를 출력
+def benchmark_suite(row_counts, output_path, repeat=3):
+    commit = current_commit()
+    previous = previous_results(output_path, commit)
+    environment = {
+        'commit': commit,
+        'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'cpus': os.cpu_count(),
+    }
+
+    with open(output_path, 'a', encoding='utf-8') as f:
+        for rows in row_counts:
+            results = measure_workbook(rows, repeat)
+            print(f"\n{'행 수':>12} {'모듈':<12} {'이름':<60} {'시간(ms)':>12} {'이전 대비':>10}")
+            for module, name, seconds in results:
+                change = f"{seconds / previous[rows, name]:.2f}x" if (rows, name) in previous else '-'
+                print(f"{rows:>12,} {module:<12} {name:<60} {seconds * 1000:>12.3f} {change:>10}")
+                f.write(json.dumps(dict(environment, rows=rows, module=module, name=name, seconds=seconds), ensure_ascii=False) + '\n')
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="사고 데이터 로드, 조회 및 예측 성능 측정 (가상 데이터 사용)")
+    parser.add_argument('rows', nargs='*', type=int, help="연도별 행 수 (--suite이면 총 행 수)")
+    parser.add_argument('--workbook', action='store_true', help="가상 워크북을 파일로 만들어 시트 로드 시간도 측정 (엑셀 쓰기/읽기로 오래 걸림)")
+    parser.add_argument('--suite', action='store_true',
+                        help="총 행 수별 가상 워크북으로 로드, 모든 조회 및 예측 함수를 측정하여 --output에 기록 (예: --suite 10000 10000000)")
+    parser.add_argument('-o', '--output', default='benchmark_results.jsonl', help="--suite 결과 파일 (JSON Lines, 실행마다 추가)")
+    parser.add_argument('--repeat', type=int, default=3, help="--suite에서 함수마다 반복 실행 횟수 (가장 짧은 시간 기록)")
+    args = parser.parse_args(sys.argv[1:])
+
+    if args.suite:
+        benchmark_suite(args.rows or SUITE_ROWS, args.output, args.repeat)
+    else:
+        row_counts = args.rows or [10_000, 100_000, 1_000_000]
+        benchmark_day_breakdown(row_counts)
+        benchmark_forecast(row_counts[0])
+        if args.workbook:
+            benchmark_workbook(row_counts[0])
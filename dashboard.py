@@ -1,97 +1,94 @@
 import sys
-import pandas as pd
-from PyQt5.QtWidgets import QApplication, QMainWindow, QLabel, QLineEdit, QPushButton, QVBoxLayout, QWidget, QTableWidget, QTableWidgetItem, QHeaderView
-from sklearn.linear_model import LinearRegression
-import numpy as np
+import math
+import time
 
-# 데이터 로드 및 전처리
-def load_and_preprocess_data(file_path):
-    all_data = {}
-    for year in ['2019', '2020', '2021', '2022', '2023']:
-        df = pd.read_excel(file_path, sheet_name=year)
-        # 데이터 전처리: 2019-2022년의 "교외활동"을 "교외"로 변경
-        if year in ['2019', '2020', '2021', '2022']:
-            df['사고장소'] = df['사고장소'].replace('교외활동', '교외')
-        all_data[year] = df
-    return all_data
+# 프로그램 시작 시각 (시작 시간 측정용, PyQt5 import 전)
+START_TIME = time.perf_counter()
 
-# 특정 시간대 사고 수 계산 및 장소별 비율 계산
-def get_hourly_accident_counts_and_place_distribution(data, region, start_hour, day):
-    counts = {}
-    place_distribution = {}
-    places = ['교실', '교외', '부속시설', '운동장', '통로']
+from PyQt5.QtCore import Qt, QTimer, QAbstractTableModel, QModelIndex
+from PyQt5.QtWidgets import QApplication, QMainWindow, QLabel, QLineEdit, QPushButton, QFileDialog, QVBoxLayout, QWidget, QTableView, QHeaderView
+from query_runner import QueryRunner, StartupTimer, load_accident_data
 
-    for year, df in data.items():
-        # DataFrame의 사본을 생성하여 원본을 변경하지 않음
-        df_copy = df.copy()
-        
-        # 사고발생시각을 datetime 형식으로 변환하고 시간 추출
-        try:
-            df_copy['사고발생시각'] = pd.to_datetime(df_copy['사고발생시각'], format='%H:%M', errors='coerce').dt.hour
-        except Exception as e:
-            print(f"Error processing 사고발생시각 in year {year}: {e}")
-            continue
 
-        # 요일 필터링
-        df_copy = df_copy[df_copy['사고발생요일'] == day]
-        
-        counts[year] = {}
-        place_distribution[year] = {}
+# 조회 결과 표 모델: (지역, 요일) 조합마다 시간별로 [사고 수, 장소별 비율 머리글, 장소별 비율...] 행이 이어짐
+# 값은 (행 × (연도 + 예측)) 배열 하나에 두고, 구분 열과 셀 문자열은 화면에 보이는 셀을 그릴 때만 만듦
+class ResultTableModel(QAbstractTableModel):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.headers = ['구분']
+        self.combos = []
+        self.start_hour = 0
+        self.places = []
+        self.values = []
 
-        for hour in range(start_hour, 24):
-            # 해당 지역 및 시간대 필터링
-            filtered_df = df_copy[(df_copy['지역'] == region) & (df_copy['사고발생시각'] == hour)]
-            
-            # 사고 수 계산
-            counts[year][hour] = len(filtered_df)
-            
-            # 사고 장소별 비율 계산
-            place_counts = filtered_df['사고장소'].value_counts()
-            total = place_counts.sum()
-            if total > 0:
-                place_distribution[year][hour] = {place: (place_counts.get(place, 0) / total) * 100 for place in places}
-            else:
-                place_distribution[year][hour] = {place: 0 for place in places}
-    
-    return counts, place_distribution
+    # values: 조합 × 시간 × (2 + 장소) 행을 펼친 배열 (빈 칸은 NaN)
+    def set_result(self, headers, combos, start_hour, places, values):
+        self.beginResetModel()
+        self.headers = headers
+        self.combos = combos
+        self.start_hour = start_hour
+        self.places = places
+        self.values = values
+        self.endResetModel()
 
-# 2024년 사고 수 예측
-def predict_2024_accidents(counts):
-    hours = list(range(24))
-    years = ['2019', '2020', '2021', '2022', '2023']
-    predictions = {}
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.values)
 
-    for hour in hours:
-        X = np.array([[int(year), hour] for year in years])
-        y = np.array([counts[year].get(hour, 0) for year in years])
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.headers)
 
-        model = LinearRegression()
-        model.fit(X, y)
-        
-        pred_2024 = model.predict([[2024, hour]])
-        predictions[hour] = max(0, int(pred_2024[0]))
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.headers[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        row, col = index.row(), index.column()
+        kind = row % (2 + len(self.places))
+        if col == 0:
+            block = row // (2 + len(self.places))
+            region, day = self.combos[block // (24 - self.start_hour)]
+            hour = self.start_hour + block % (24 - self.start_hour)
+            prefix = f'{region} {day}요일 ' if len(self.combos) > 1 else ''
+            if kind == 0:
+                return f'{prefix}{hour}시-{hour+1}시 사고 수'
+            if kind == 1:
+                return f'{prefix}{hour}시-{hour+1}시 장소별 비율 (%)'
+            return self.places[kind - 2]
+        value = self.values[row, col - 1]
+        if math.isnan(value):
+            return None
+        return str(int(value)) if kind == 0 else f"{value:.2f}"
 
-    return predictions
 
 # PyQt GUI
 class MainWindow(QMainWindow):
-    def __init__(self, data):
+    def __init__(self, data=None):
         super().__init__()
         
         self.data = data
+        self.runner = QueryRunner(self)
         
         self.setWindowTitle("지역별 학교 안전사고 수")
         
         self.layout = QVBoxLayout()
         
-        self.region_label = QLabel("지역:")
+        self.region_label = QLabel("지역 (여러 지역은 쉼표로 구분):")
         self.region_input = QLineEdit()
         self.start_hour_label = QLabel("시작 시간 (0-23):")
         self.start_hour_input = QLineEdit()
-        self.day_label = QLabel("요일 (월, 화, 수, 목, 금, 토, 일):")
+        self.day_label = QLabel("요일 (월, 화, 수, 목, 금, 토, 일 / 여러 요일은 쉼표로 구분):")
         self.day_input = QLineEdit()
         self.predict_button = QPushButton("사고 수 확인")
-        self.result_table = QTableWidget()
+        self.append_button = QPushButton("데이터 추가")
+        self.result_model = ResultTableModel(self)
+        self.result_table = QTableView()
+        self.result_table.setModel(self.result_model)
+        # 행 높이를 고정하여 행이 많아도 스크롤할 때 보이는 행만 배치
+        self.result_table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.result_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
         
         self.layout.addWidget(self.region_label)
         self.layout.addWidget(self.region_input)
@@ -100,55 +97,126 @@ class MainWindow(QMainWindow):
         self.layout.addWidget(self.day_label)
         self.layout.addWidget(self.day_input)
         self.layout.addWidget(self.predict_button)
+        self.layout.addWidget(self.append_button)
         self.layout.addWidget(self.result_table)
         
         self.predict_button.clicked.connect(self.show_accident_counts)
+        self.append_button.clicked.connect(self.append_data)
+        self.has_result = False
+        self.startup = StartupTimer(START_TIME)
+        
+        # 데이터가 로드될 때까지 조회 및 추가 버튼을 끔
+        self.set_buttons_enabled(data is not None)
         
         container = QWidget()
         container.setLayout(self.layout)
         self.setCentralWidget(container)
     
     def show_accident_counts(self):
-        region = self.region_input.text()
-        start_hour = int(self.start_hour_input.text())
-        day = self.day_input.text()
+        from queries import get_hourly_accident_counts_and_place_distribution, predict_next_year_accidents
         
-        counts, place_distribution = get_hourly_accident_counts_and_place_distribution(self.data, region, start_hour, day)
-        predictions_2024 = predict_2024_accidents(counts)
+        regions = [region.strip() for region in self.region_input.text().split(',') if region.strip()]
+        start_hour = self.start_hour_input.text().strip()
+        if not start_hour.isdigit() or int(start_hour) > 23:
+            self.statusBar().showMessage("시작 시간은 0-23 사이의 정수여야 합니다")
+            return
+        start_hour = int(start_hour)
+        days = [day.strip() for day in self.day_input.text().split(',') if day.strip()]
+        combos = [(region, day) for region in regions for day in days]
         
-        # 결과 표 설정
-        self.result_table.clear()
+        # (지역, 요일) 조합마다 시간별 사고 수를 조회하고 그 결과로 예측
+        def query_step(region, day):
+            def step():
+                counts, place_distribution = get_hourly_accident_counts_and_place_distribution(self.data, region, start_hour, day)
+                predictions = self.data.result_cache.get_or_compute(
+                    (region, 'predict_next_year_accidents', start_hour, day), lambda: predict_next_year_accidents(counts))
+                return counts, place_distribution, predictions
+            return step
         
-        # 연도별 사고 수 및 장소별 비율 설정
-        total_rows = (24 - start_hour) * (2 + len(['교실', '교외', '부속시설', '운동장', '통로']))
-        self.result_table.setRowCount(total_rows)
-        self.result_table.setColumnCount(7)
-        self.result_table.setHorizontalHeaderLabels(['구분', '2019', '2020', '2021', '2022', '2023', '2024 예측'])
+        # 계산은 작업 스레드에서 실행하고 결과는 UI 스레드에서 표시 (새 조회를 시작하면 이전 조회는 취소)
+        self.statusBar().showMessage("조회 중...")
+        self.runner.submit(
+            [(f'{region} {day}요일 시간별 사고 수 및 {self.data.forecast_year}년 예측', query_step(region, day)) for region, day in combos],
+            lambda results: self.render_accident_counts(start_hour, combos, results),
+            self.show_progress, self.show_error)
+    
+    # 데이터를 작업 스레드에서 로드 (창을 먼저 표시하고 pandas 등 무거운 모듈은 이때 import)
+    def load_data(self, file_path):
+        self.statusBar().showMessage("데이터 로드 중...")
+        self.runner.submit(
+            [('데이터 로드', lambda: load_accident_data(file_path))],
+            lambda results: self.set_data(*results),
+            self.show_progress, lambda message: self.statusBar().showMessage(f"데이터 로드 실패: {message}"))
+    
+    def set_data(self, data):
+        self.data = data
+        self.set_buttons_enabled(True)
+        self.statusBar().showMessage(f"데이터 로드 완료 ({', '.join(data.years)}년)")
+        self.startup.mark('조회 가능')
+    
+    # 선택한 워크북의 행을 작업 스레드에서 로드된 데이터에 추가하고, 표시 중인 결과가 있으면 다시 조회
+    def append_data(self):
+        file_path, _ = QFileDialog.getOpenFileName(self, "추가할 데이터 선택", "", "Excel 파일 (*.xlsx)")
+        if not file_path:
+            return
         
-        row = 0
-        for hour in range(start_hour, 24):
-            self.result_table.setItem(row, 0, QTableWidgetItem(f'{hour}시-{hour+1}시 사고 수'))
-            for col, year in enumerate(['2019', '2020', '2021', '2022', '2023'], start=1):
-                self.result_table.setItem(row, col, QTableWidgetItem(str(counts[year][hour])))
-            self.result_table.setItem(row, 6, QTableWidgetItem(str(predictions_2024[hour])))
-            row += 1
-
-            self.result_table.setItem(row, 0, QTableWidgetItem(f'{hour}시-{hour+1}시 장소별 비율 (%)'))
-            row += 1
-            for place in ['교실', '교외', '부속시설', '운동장', '통로']:
-                self.result_table.setItem(row, 0, QTableWidgetItem(place))
-                for col, year in enumerate(['2019', '2020', '2021', '2022', '2023'], start=1):
-                    self.result_table.setItem(row, col, QTableWidgetItem(f"{place_distribution[year][hour].get(place, 0):.2f}"))
-                row += 1
+        # 추가가 끝날 때까지 버튼을 꺼서 추가 중 새 조회나 두 번째 추가로 추가 작업이 취소되지 않도록 함
+        self.set_buttons_enabled(False)
+        self.statusBar().showMessage("데이터 추가 중...")
+        self.runner.submit(
+            [('데이터 추가', lambda: self.data.append_workbook(file_path))],
+            lambda results: self.refresh(),
+            self.show_progress, self.append_failed)
+    
+    def append_failed(self, message):
+        self.set_buttons_enabled(True)
+        self.statusBar().showMessage(f"데이터 추가 실패: {message}")
+    
+    def refresh(self):
+        self.set_buttons_enabled(True)
+        if self.has_result:
+            self.show_accident_counts()
+        else:
+            self.statusBar().showMessage(f"데이터 추가 완료 ({', '.join(self.data.years)}년)")
+    
+    def set_buttons_enabled(self, enabled):
+        self.predict_button.setEnabled(enabled)
+        self.append_button.setEnabled(enabled)
+    
+    def show_progress(self, step, total, label):
+        self.statusBar().showMessage(f"{label} ({step + 1}/{total})")
+    
+    def show_error(self, message):
+        self.statusBar().showMessage(f"조회 실패: {message}")
+    
+    def render_accident_counts(self, start_hour, combos, results):
+        import numpy as np
+        from school_data import PLACES
         
-        self.result_table.resizeColumnsToContents()
-        self.result_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.statusBar().showMessage(self.data.result_cache.summary())
+        self.has_result = True
+        self.startup.mark('첫 조회 결과 표시')
+        
+        # 조합 × 시간 × (사고 수, 비율 머리글, 장소...) 행 × (연도..., 예측) 열 배열 (빈 칸은 NaN)
+        years = self.data.years
+        hours = range(start_hour, 24)
+        values = np.full((len(combos), len(hours), 2 + len(PLACES), len(years) + 1), np.nan)
+        # 시간이 없으면(시작 시간 24 이상) 빈 표: 빈 리스트는 (0, 연도) 칸에 대입할 수 없으므로 채우지 않음
+        for c, (counts, place_distribution, predictions) in enumerate(results if len(hours) > 0 else []):
+            values[c, :, 0, :-1] = [[counts[year][hour] for year in years] for hour in hours]
+            values[c, :, 0, -1] = [predictions[hour] for hour in hours]
+            values[c, :, 2:, :-1] = [[[place_distribution[year][hour].get(place, 0) for year in years] for place in PLACES] for hour in hours]
+        
+        self.result_model.set_result(['구분'] + years + [f'{self.data.forecast_year} 예측'], combos, start_hour, PLACES,
+                                     values.reshape(-1, len(years) + 1))
 
 if __name__ == '__main__':
     file_path = 'c:\\Users\\kimdh\\Desktop\\공모전\\schooldata\\schoolData.xlsx'
-    data = load_and_preprocess_data(file_path)
     
     app = QApplication(sys.argv)
-    window = MainWindow(data)
+    window = MainWindow()
     window.show()
+    # 창을 먼저 표시하고 데이터는 작업 스레드에서 로드
+    QTimer.singleShot(0, lambda: window.startup.mark('첫 화면 표시'))
+    window.load_data(file_path)
     sys.exit(app.exec_())
@@ -0,0 +1,195 @@
+# 조회 및 예측 함수 (PyQt5 없이 GUI와 배치 모드에서 함께 사용)
+import numpy as np
+from school_data import PLACES, DAYS, forecast_linear, cached_query
+from profiling import stage
+
+
+# 특정 시간대의 연도별 사고 수, 장소별 비율, 요일별 사고 수 및 장소별 비율 (school.py)
+@cached_query
+def get_daily_accident_counts_and_place_distribution(data, region, start_hour, end_hour):
+    counts = {}
+    place_distribution = {}
+    day_distribution = {}
+    places = PLACES
+    days = DAYS
+
+    # 연도 × 요일 × 장소 사고 수 (사고 수 텐서에서 시간대 구간 합으로 계산)
+    cube = data.cube
+    with stage('filter'):
+        window = cube.window(region, start_hour, end_hour)
+
+    with stage('aggregate'):
+        # 모든 연도/요일의 사고 수와 장소별 비율을 한 번에 계산 (텐서의 요일 축은 DAYS 순서로 시작)
+        day_counts = window.sum(axis=2)
+        day_percentages, day_totals = cube.place_percentages(window)
+        year_percentages, year_totals = cube.place_percentages(window.sum(axis=1))
+
+        for i, year in enumerate(cube.years):
+            # 사고 수 계산
+            counts[year] = int(day_counts[i].sum())
+        
+            # 사고 장소별 비율
+            if year_totals[i] > 0:
+                place_distribution[year] = dict(zip(places, year_percentages[i]))
+            else:
+                place_distribution[year] = {place: 0 for place in places}
+        
+            # 요일별 사고 수 및 장소별 비율
+            day_distribution[year] = {}
+            for d, day in enumerate(days):
+                if day_totals[i, d] > 0:
+                    day_distribution[year][day] = {
+                        'count': int(day_counts[i, d]),
+                        'places': dict(zip(places, day_percentages[i, d]))
+                    }
+                else:
+                    day_distribution[year][day] = {
+                        'count': 0,
+                        'places': {place: 0 for place in places}
+                    }
+    
+    return counts, place_distribution, day_distribution
+
+# 특정 요일/시간대의 연도별 사고 수, 장소별 비율 및 횟수 (analysis.py)
+@cached_query
+def get_accident_counts_and_place_distribution(data, region, day, start_hour, end_hour):
+    counts = {}
+    place_distribution = {}
+    place_counts_total = {}
+    places = PLACES
+
+    # 연도 × 장소 사고 수 (사고 수 텐서에서 시간대 구간 합으로 계산)
+    cube = data.cube
+    with stage('filter'):
+        window = cube.window(region, start_hour, end_hour, day)
+
+    with stage('aggregate'):
+        for i, year in enumerate(cube.years):
+            # 사고 수 계산
+            counts[year] = int(window[i].sum())
+        
+            # 사고 장소별 비율 및 횟수 계산
+            place_counts, total = cube.place_counts(window[i])
+            place_counts_total[year] = {place: int(count) for place, count in zip(cube.places, window[i]) if count > 0}
+            if total > 0:
+                place_distribution[year] = {place: (place_counts[j] / total) * 100 for j, place in enumerate(places)}
+            else:
+                place_distribution[year] = {place: 0 for place in places}
+    
+    return counts, place_distribution, place_counts_total
+
+# 선형 회귀(최소제곱)를 이용한 사고 장소별 다음 해(data.forecast_year) 사고 수 예측
+def predict_accidents_by_place(data, region, day, start_hour, end_hour):
+    return predict_accidents_by_place_windows(data, region, day, [(start_hour, end_hour)])[0]
+
+# 여러 시간대의 사고 장소별 다음 해 사고 수를 한 번에 예측 (시간대마다 predict_accidents_by_place와 같은 결과)
+@cached_query
+def predict_accidents_by_place_windows(data, region, day, hour_windows):
+    # 시간대 × 연도 × 장소 사고 수
+    cube = data.cube
+    with stage('filter'):
+        place_counts, _ = cube.place_counts(cube.windows(region, hour_windows, day))
+    years = [int(year) for year in cube.years]
+    
+    # 모든 시간대/장소의 다음 해 사고 수를 한 번에 예측 (연도 축을 앞으로)
+    # 예측 연도도 같은 텐서에서 계산 (data.forecast_year는 그 사이 append로 연도가 늘었으면 다른 텐서 기준)
+    predictions = forecast_linear(years, place_counts.transpose(1, 0, 2), years[-1] + 1)
+    totals = predictions.sum(axis=1)
+
+    results = []
+    with stage('aggregate'):
+        for w in range(len(predictions)):
+            predicted_counts = {place: predictions[w, j] for j, place in enumerate(PLACES)}
+            total_predicted_count = totals[w]
+            predicted_percentage = {place: (count / total_predicted_count) * 100 if total_predicted_count > 0 else 0 for place, count in predicted_counts.items()}
+            results.append((predicted_counts, total_predicted_count, predicted_percentage))
+
+    return results
+
+# 여러 지역(기본: 데이터의 모든 지역)의 특정 요일/시간대 비교 (day가 None이면 모든 요일)
+# 반환: 지역별 연도별 사고 수, 연도별 장소별 비율, 다음 해 예측 (predict_accidents_by_place와 같은 형식),
+#       예측 사고 수가 마지막 연도보다 가장 많이 늘어나는 top_k 지역의 [(지역, 증가량), ...]
+# 지역마다 조회하지 않고 사고 수 텐서에서 모든 지역을 한 번에 잘라 계산하며, 지역 집합마다 결과가 달라 캐시하지 않음
+def compare_regions(data, day, start_hour, end_hour, regions=None, top_k=5):
+    cube = data.cube
+    regions = list(cube.regions if regions is None else regions)
+    with stage('filter'):
+        # 연도 × 지역 × 장소
+        window = cube.regions_window(regions, start_hour, end_hour, day)
+        if day is None:
+            window = window.sum(axis=2)
+
+    with stage('aggregate'):
+        region_counts = window.sum(axis=2)
+        percentages, totals = cube.place_percentages(window)
+        place_counts, _ = cube.place_counts(window)
+
+    # 모든 지역/장소의 다음 해 사고 수를 한 번에 예측하고 마지막 연도 대비 증가량으로 순위 계산
+    # 예측은 고정 장소(PLACES)만 합하므로 기준도 마지막 연도의 PLACES 사고 수 (기타 장소 제외)
+    predictions = forecast_linear([int(year) for year in cube.years], place_counts, int(cube.years[-1]) + 1)
+    predicted_totals = predictions.sum(axis=1)
+    growth = predicted_totals - place_counts[-1].sum(axis=-1)
+    # 증가량이 같은 지역은 부동소수점 오차가 아니라 regions 순서로 정렬되도록 반올림한 값으로 순위 계산
+    ranking = np.argsort(-np.round(growth, 9), kind='stable')[:top_k]
+
+    counts = {}
+    place_distribution = {}
+    forecasts = {}
+    with stage('aggregate'):
+        for r, region in enumerate(regions):
+            counts[region] = {year: int(region_counts[i, r]) for i, year in enumerate(cube.years)}
+            place_distribution[region] = {
+                year: dict(zip(PLACES, percentages[i, r])) if totals[i, r] > 0 else {place: 0 for place in PLACES}
+                for i, year in enumerate(cube.years)
+            }
+            predicted_counts = {place: predictions[r, j] for j, place in enumerate(PLACES)}
+            total_predicted_count = predicted_totals[r]
+            predicted_percentage = {place: (count / total_predicted_count) * 100 if total_predicted_count > 0 else 0 for place, count in predicted_counts.items()}
+            forecasts[region] = (predicted_counts, total_predicted_count, predicted_percentage)
+
+    return counts, place_distribution, forecasts, [(regions[r], float(growth[r])) for r in ranking]
+
+# 특정 요일의 시간별 사고 수 및 장소별 비율 (dashboard.py)
+@cached_query
+def get_hourly_accident_counts_and_place_distribution(data, region, start_hour, day):
+    counts = {}
+    place_distribution = {}
+    places = PLACES
+
+    # 연도 × 시간 × 장소 사고 수 (사고 수 텐서에서 지역/요일 슬라이스)
+    cube = data.cube
+    with stage('filter'):
+        hourly = cube.hourly(region, day)
+
+    with stage('aggregate'):
+        # 모든 연도/시간의 사고 수와 장소별 비율을 한 번에 계산
+        hour_counts = hourly.sum(axis=2)
+        hour_percentages, hour_totals = cube.place_percentages(hourly)
+
+        for i, year in enumerate(cube.years):
+            counts[year] = {}
+            place_distribution[year] = {}
+
+            for hour in range(start_hour, 24):
+                # 0-23 밖의 시간이나 장소가 기록된 사고가 없는 시간은 비율 0
+                if hour >= 0 and hour_totals[i, hour] > 0:
+                    counts[year][hour] = int(hour_counts[i, hour])
+                    place_distribution[year][hour] = dict(zip(places, hour_percentages[i, hour]))
+                else:
+                    counts[year][hour] = int(hour_counts[i, hour]) if hour >= 0 else 0
+                    place_distribution[year][hour] = {place: 0 for place in places}
+    
+    return counts, place_distribution
+
+# 마지막 연도의 다음 해 사고 수 예측
+def predict_next_year_accidents(counts):
+    hours = list(range(24))
+    years = list(counts.keys())
+
+    # 연도 × 시간 사고 수로 24개 시간의 예측을 한 번에 계산
+    y = np.array([[counts[year].get(hour, 0) for hour in hours] for year in years])
+    pred = forecast_linear([int(year) for year in years], y, int(years[-1]) + 1)
+    # 정수 연도/사고 수의 예측값은 정확히 정수인 경우가 많으므로, 부동소수점 오차로 정수 바로 아래가 된 값이 1 작게 잘리지 않도록 보정 후 버림
+    predictions = {hour: max(0, int(np.floor(pred[hour] + 1e-9))) for hour in hours}
+
+    return predictions
@@ -0,0 +1,155 @@
+import time
+import threading
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, QTimer, QElapsedTimer, pyqtSignal
+from PyQt5.QtWidgets import QMainWindow
+from profiling import profiler, stage
+
+
+# 작업 스레드에서 UI 스레드로 결과를 전달하는 시그널 (QObject가 UI 스레드에 있으므로 슬롯은 UI 스레드에서 실행)
+class QuerySignals(QObject):
+    progress = pyqtSignal(int, int, int, str)
+    finished = pyqtSignal(int, object)
+    failed = pyqtSignal(int, str)
+
+# 조회 단계(label, 함수)를 순서대로 실행하며 단계 사이마다 취소 여부 확인
+class QueryTask(QRunnable):
+    def __init__(self, query_id, steps, signals, cancelled):
+        super().__init__()
+        self.query_id = query_id
+        self.steps = steps
+        self.signals = signals
+        self.cancelled = cancelled
+
+    def run(self):
+        results = []
+        try:
+            for i, (label, func) in enumerate(self.steps):
+                if self.cancelled.is_set():
+                    return
+                self.signals.progress.emit(self.query_id, i, len(self.steps), label)
+                with stage(label):
+                    results.append(func())
+        except Exception as e:
+            if not self.cancelled.is_set():
+                self.signals.failed.emit(self.query_id, str(e))
+            return
+        if not self.cancelled.is_set():
+            self.signals.finished.emit(self.query_id, results)
+
+# 조회를 QThreadPool에서 실행, 새 조회를 시작하면 진행 중인 조회는 취소
+class QueryRunner(QObject):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.pool = QThreadPool(self)
+        self.signals = QuerySignals(self)
+        self.signals.progress.connect(self._on_progress)
+        self.signals.finished.connect(self._on_finished)
+        self.signals.failed.connect(self._on_failed)
+        self.query_id = 0
+        self.cancelled = None
+        self.callbacks = None
+        self.start_time = None
+        self.stall_monitor = StallMonitor(parent=self)
+        self.stall_monitor.start()
+
+    # steps: [(단계 이름, 인자 없는 함수), ...], on_result(results)는 UI 스레드에서 호출
+    def submit(self, steps, on_result, on_progress=None, on_error=None):
+        self.cancel()
+        self.query_id += 1
+        self.cancelled = threading.Event()
+        self.callbacks = (on_result, on_progress, on_error)
+        self.start_time = time.perf_counter()
+        self.stall_monitor.reset()
+        profiler.reset()
+        self.pool.start(QueryTask(self.query_id, steps, self.signals, self.cancelled))
+
+    def cancel(self):
+        if self.cancelled is not None:
+            self.cancelled.set()
+        self.callbacks = None
+
+    # 취소되었거나 이전 조회의 시그널은 무시
+    def _current(self, query_id):
+        return query_id == self.query_id and self.callbacks is not None
+
+    def _on_progress(self, query_id, step, total, label):
+        if self._current(query_id) and self.callbacks[1] is not None:
+            self.callbacks[1](step, total, label)
+
+    # 결과 표시 중의 예외도 Qt 슬롯 밖으로 나가면 프로그램이 종료되므로 작업 실패와 같이 on_error로 전달
+    def _on_finished(self, query_id, results):
+        if self._current(query_id):
+            on_result, _, on_error = self.callbacks
+            self.callbacks = None
+            print(f"조회 완료: {time.perf_counter() - self.start_time:.3f}초 (UI 최대 멈춤 {self.stall_monitor.reset()}ms)")
+            try:
+                with stage('render'):
+                    on_result(results)
+            except Exception as e:
+                self._report_error(on_error, str(e))
+                return
+            self._show_profile()
+
+    def _on_failed(self, query_id, message):
+        if self._current(query_id):
+            on_error = self.callbacks[2]
+            self.callbacks = None
+            self._report_error(on_error, message)
+
+    def _report_error(self, on_error, message):
+        print(f"조회 실패: {message}")
+        if on_error is not None:
+            on_error(message)
+
+    # 측정이 켜져 있으면 이번 조회의 단계별 시간/메모리을 출력하고 창의 상태 표시줄 메시지 뒤에 표시
+    def _show_profile(self):
+        if not profiler.enabled:
+            return
+        summary = profiler.summary()
+        print(f"단계별 시간/메모리: {summary}")
+        window = self.parent()
+        if isinstance(window, QMainWindow):
+            status_bar = window.statusBar()
+            status_bar.showMessage(f"{status_bar.currentMessage()} | {summary}")
+
+# 사고 데이터 로드: pandas 등 무거운 모듈을 처음 import하므로 창을 띄운 뒤 작업 스레드에서 호출
+def load_accident_data(file_path):
+    from school_data import load_and_preprocess_data
+    import queries
+    return load_and_preprocess_data(file_path)
+
+# 시작 시간 측정: start_time(프로그램 시작)부터 첫 화면 표시, 조회 가능, 첫 조회 결과 표시까지 걸린 시간을 한 번씩 출력
+class StartupTimer:
+    def __init__(self, start_time):
+        self.start_time = start_time
+        self.marked = set()
+
+    def mark(self, name):
+        if name not in self.marked:
+            self.marked.add(name)
+            print(f"시작 후 {name}: {time.perf_counter() - self.start_time:.3f}초")
+
+# 이벤트 루프 응답성 측정: interval_ms마다 타이머를 걸고 예정보다 늦게 실행된 시간을 멈춤(stall) 시간으로 기록
+class StallMonitor(QObject):
+    def __init__(self, interval_ms=10, parent=None):
+        super().__init__(parent)
+        self.interval_ms = interval_ms
+        self.max_stall_ms = 0
+        self.clock = QElapsedTimer()
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self._tick)
+
+    def start(self):
+        self.max_stall_ms = 0
+        self.clock.start()
+        self.timer.start(self.interval_ms)
+
+    def _tick(self):
+        stall = self.clock.restart() - self.interval_ms
+        self.max_stall_ms = max(self.max_stall_ms, stall)
+
+    # 지금까지의 최대 멈춤 시간(ms)을 돌려주고 측정을 다시 시작
+    def reset(self):
+        stall = self.max_stall_ms
+        self.max_stall_ms = 0
+        return stall
@@ -1,80 +1,21 @@
 import sys
-import pandas as pd
-from PyQt5.QtWidgets import QApplication, QMainWindow, QLabel, QLineEdit, QPushButton, QVBoxLayout, QWidget, QTextEdit
-import datetime
+import time
 
-# 데이터 로드 및 전처리
-def load_and_preprocess_data(file_path):
-    # 엑셀 파일 읽기
-    all_data = {}
-    for year in ['2019', '2020', '2021', '2022', '2023']:
-        df = pd.read_excel(file_path, sheet_name=year)
-        # 데이터 전처리: 2019-2022년의 "교외활동"을 "교외"로 변경
-        if year in ['2019', '2020', '2021', '2022']:
-            df['사고장소'] = df['사고장소'].replace('교외활동', '교외')
-        all_data[year] = df
-    
-    return all_data
+# 프로그램 시작 시각 (시작 시간 측정용, PyQt5 import 전)
+START_TIME = time.perf_counter()
 
-# 특정 시간대 사고 수 계산 및 장소별 비율 계산
-def get_accident_counts_and_place_distribution(data, region, start_hour, end_hour):
-    counts = {}
-    place_distribution = {}
-    day_distribution = {}
-    places = ['교실', '교외', '부속시설', '운동장', '통로']
-    days = ['월', '화', '수', '목', '금', '토', '일']
+from PyQt5.QtCore import QTimer
+from PyQt5.QtWidgets import QApplication, QMainWindow, QLabel, QLineEdit, QPushButton, QFileDialog, QVBoxLayout, QWidget, QTextEdit
+from query_runner import QueryRunner, StartupTimer, load_accident_data
 
-    for year, df in data.items():
-        # DataFrame의 사본을 생성하여 원본을 변경하지 않음
-        df_copy = df.copy()
-        
-        # 사고발생시각을 datetime 형식으로 변환하고 시간 추출
-        try:
-            df_copy['사고발생시각'] = pd.to_datetime(df_copy['사고발생시각'], format='%H:%M', errors='coerce').dt.hour
-        except Exception as e:
-            print(f"Error processing 사고발생시각 in year {year}: {e}")
-            continue
-
-        # 해당 지역 및 시간대 필터링
-        filtered_df = df_copy[(df_copy['지역'] == region) & (df_copy['사고발생시각'] >= start_hour) & (df_copy['사고발생시각'] < end_hour)]
-        
-        # 사고 수 계산
-        counts[year] = len(filtered_df)
-        
-        # 사고 장소별 비율 계산
-        place_counts = filtered_df['사고장소'].value_counts()
-        total = place_counts.sum()
-        if total > 0:
-            place_distribution[year] = {place: (place_counts.get(place, 0) / total) * 100 for place in places}
-        else:
-            place_distribution[year] = {place: 0 for place in places}
-        
-        # 요일별 사고 수 및 장소별 비율 계산
-        day_distribution[year] = {}
-        for day in days:
-            day_df = filtered_df[filtered_df['사고발생요일'] == day]
-            day_count = len(day_df)
-            day_place_counts = day_df['사고장소'].value_counts()
-            day_total = day_place_counts.sum()
-            if day_total > 0:
-                day_distribution[year][day] = {
-                    'count': day_count,
-                    'places': {place: (day_place_counts.get(place, 0) / day_total) * 100 for place in places}
-                }
-            else:
-                day_distribution[year][day] = {
-                    'count': 0,
-                    'places': {place: 0 for place in places}
-                }
-    
-    return counts, place_distribution, day_distribution
 
 # PyQt GUI
 class MainWindow(QMainWindow):
-    def __init__(self, data):
+    def __init__(self, data=None):
         super().__init__()
         
         self.data = data
+        self.runner = QueryRunner(self)
         
         self.setWindowTitle("지역별 학교 안전사고 수")
         
@@ -87,6 +28,7 @@ class MainWindow(QMainWindow):
         self.end_hour_label = QLabel("종료 시간 (1-24):")
         self.end_hour_input = QLineEdit()
         self.predict_button = QPushButton("사고 수 확인")
+        self.append_button = QPushButton("데이터 추가")
         self.result_label = QTextEdit()
         
         self.layout.addWidget(self.region_label)
@@ -96,20 +38,89 @@ class MainWindow(QMainWindow):
         self.layout.addWidget(self.end_hour_label)
         self.layout.addWidget(self.end_hour_input)
         self.layout.addWidget(self.predict_button)
+        self.layout.addWidget(self.append_button)
         self.layout.addWidget(self.result_label)
         
         self.predict_button.clicked.connect(self.show_accident_counts)
+        self.append_button.clicked.connect(self.append_data)
+        self.has_result = False
+        self.startup = StartupTimer(START_TIME)
+        
+        # 데이터가 로드될 때까지 조회 및 추가 버튼을 끔
+        self.set_buttons_enabled(data is not None)
         
         container = QWidget()
         container.setLayout(self.layout)
         self.setCentralWidget(container)
     
     def show_accident_counts(self):
+        from queries import get_daily_accident_counts_and_place_distribution
+        
         region = self.region_input.text()
         start_hour = int(self.start_hour_input.text())
         end_hour = int(self.end_hour_input.text())
         
-        counts, place_distribution, day_distribution = get_accident_counts_and_place_distribution(self.data, region, start_hour, end_hour)
+        # 계산은 작업 스레드에서 실행하고 결과는 UI 스레드에서 표시 (새 조회를 시작하면 이전 조회는 취소)
+        self.statusBar().showMessage("조회 중...")
+        self.runner.submit(
+            [('사고 수 및 장소별 비율 계산', lambda: get_daily_accident_counts_and_place_distribution(self.data, region, start_hour, end_hour))],
+            lambda results: self.render_accident_counts(region, start_hour, end_hour, *results),
+            self.show_progress, self.show_error)
+    
+    # 데이터를 작업 스레드에서 로드 (창을 먼저 표시하고 pandas 등 무거운 모듈은 이때 import)
+    def load_data(self, file_path):
+        self.statusBar().showMessage("데이터 로드 중...")
+        self.runner.submit(
+            [('데이터 로드', lambda: load_accident_data(file_path))],
+            lambda results: self.set_data(*results),
+            self.show_progress, lambda message: self.statusBar().showMessage(f"데이터 로드 실패: {message}"))
+    
+    def set_data(self, data):
+        self.data = data
+        self.set_buttons_enabled(True)
+        self.statusBar().showMessage(f"데이터 로드 완료 ({', '.join(data.years)}년)")
+        self.startup.mark('조회 가능')
+    
+    # 선택한 워크북의 행을 작업 스레드에서 로드된 데이터에 추가하고, 표시 중인 결과가 있으면 다시 조회
+    def append_data(self):
+        file_path, _ = QFileDialog.getOpenFileName(self, "추가할 데이터 선택", "", "Excel 파일 (*.xlsx)")
+        if not file_path:
+            return
+        
+        # 추가가 끝날 때까지 버튼을 꺼서 추가 중 새 조회나 두 번째 추가로 추가 작업이 취소되지 않도록 함
+        self.set_buttons_enabled(False)
+        self.statusBar().showMessage("데이터 추가 중...")
+        self.runner.submit(
+            [('데이터 추가', lambda: self.data.append_workbook(file_path))],
+            lambda results: self.refresh(),
+            self.show_progress, self.append_failed)
+    
+    def append_failed(self, message):
+        self.set_buttons_enabled(True)
+        self.statusBar().showMessage(f"데이터 추가 실패: {message}")
+    
+    def refresh(self):
+        self.set_buttons_enabled(True)
+        if self.has_result:
+            self.show_accident_counts()
+        else:
+            self.statusBar().showMessage(f"데이터 추가 완료 ({', '.join(self.data.years)}년)")
+    
+    def set_buttons_enabled(self, enabled):
+        self.predict_button.setEnabled(enabled)
+        self.append_button.setEnabled(enabled)
+    
+    def show_progress(self, step, total, label):
+        self.statusBar().showMessage(f"{label} ({step + 1}/{total})")
+    
+    def show_error(self, message):
+        self.statusBar().showMessage(f"조회 실패: {message}")
+    
+    def render_accident_counts(self, region, start_hour, end_hour, query):
+        counts, place_distribution, day_distribution = query
+        self.statusBar().showMessage(self.data.result_cache.summary())
+        self.has_result = True
+        self.startup.mark('첫 조회 결과 표시')
         
         result_text = f"{region} 지역에서 {start_hour}시부터 {end_hour}시까지의 사고 수:\n"
         for year, count in counts.items():
@@ -133,9 +144,11 @@ class MainWindow(QMainWindow):
 
 if __name__ == '__main__':
     file_path = 'schoolData.xlsx'
-    data = load_and_preprocess_data(file_path)
     
     app = QApplication(sys.argv)
-    window = MainWindow(data)
+    window = MainWindow()
     window.show()
+    # 창을 먼저 표시하고 데이터는 작업 스레드에서 로드
+    QTimer.singleShot(0, lambda: window.startup.mark('첫 화면 표시'))
+    window.load_data(file_path)
     sys.exit(app.exec_())
@@ -0,0 +1,548 @@
+import os
+import json
+import time
+import pickle
+import threading
+import functools
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from profiling import profiler, stage
+
+PLACES = ['교실', '교외', '부속시설', '운동장', '통로']
+DAYS = ['월', '화', '수', '목', '금', '토', '일']
+
+# 캐시 형식이 바뀌면 이 값을 올려서 기존 캐시를 무효화
+CACHE_VERSION = 4
+
+# 조회 결과 캐시의 기본 메모리 한도 (바이트)
+RESULT_CACHE_BYTES = 64 * 1024 * 1024
+
+# 사고발생시각("HH:MM")을 한 번만 파싱하여 시/분 정수 컬럼 추가
+# 파싱할 수 없는 행은 -1로 표시하며, 어떤 시간대 조회에도 포함되지 않음
+def add_time_columns(df, year):
+    try:
+        times = pd.to_datetime(df['사고발생시각'], format='%H:%M', errors='coerce')
+    except Exception as e:
+        print(f"Error processing 사고발생시각 in year {year}: {e}")
+        times = pd.Series(pd.NaT, index=df.index)
+
+    df['사고발생시'] = times.dt.hour.fillna(-1).astype('int8')
+    df['사고발생분'] = times.dt.minute.fillna(-1).astype('int8')
+    return df
+
+# 조회에 사용하는 컬럼 (나머지 컬럼은 로드할 때 제거)
+QUERY_COLUMNS = ['지역', '사고발생요일', '사고장소', '사고발생시', '사고발생분']
+
+# 스트리밍 로드: 시트에서 읽는 컬럼과 사고 수(사고건수)를 누적하는 키
+STREAM_COLUMNS = ['지역', '사고발생요일', '사고발생시각', '사고장소']
+COUNT_KEYS = ['지역', '사고발생요일', '사고발생시', '사고장소']
+
+# 합친 DataFrame의 정렬된 인덱스
+INDEX_COLUMNS = ['지역', '사고발생요일', '연도']
+
+# 연도 시트(이름이 4자리 숫자인 시트)를 찾아 연도순으로 정렬
+def find_year_sheets(sheet_names):
+    return sorted(name for name in sheet_names if len(name) == 4 and name.isdigit())
+
+# 모든 연도에 공통인 어휘: 고정 목록(fixed) 다음에 그 밖에 관측된 값을 정렬하여 추가
+# existing을 주면 기존 어휘에 새 값을 더한 어휘 (처음부터 다시 만든 것과 같은 순서)
+def build_vocabulary(frames, column, fixed, existing=()):
+    values = set(existing)
+    for df in frames:
+        if isinstance(df[column].dtype, pd.CategoricalDtype):
+            values.update(df[column].cat.categories)
+        else:
+            values.update(df[column].dropna().unique())
+    return fixed + sorted((v for v in values if v not in fixed), key=str)
+
+# 조회에 쓰지 않는 컬럼을 제거하고 지역/요일/장소를 연도 공통 어휘의 범주형으로 변환
+def compact_frames(all_data, columns=QUERY_COLUMNS):
+    frames = list(all_data.values())
+    vocabularies = {
+        '지역': build_vocabulary(frames, '지역', []),
+        '사고발생요일': build_vocabulary(frames, '사고발생요일', DAYS),
+        '사고장소': build_vocabulary(frames, '사고장소', PLACES),
+    }
+    compacted = {}
+    for year, df in all_data.items():
+        df = df[columns].copy()
+        for column, vocabulary in vocabularies.items():
+            df[column] = pd.Categorical(df[column], categories=vocabulary)
+        compacted[year] = df
+    return compacted
+
+# 연도별 DataFrame을 연도 컬럼(범주형, 연도순)을 붙여 하나로 합침
+def combine_frames(all_data):
+    frame = pd.concat([df.assign(연도=year) for year, df in all_data.items()], ignore_index=True)
+    frame['연도'] = pd.Categorical(frame['연도'], categories=list(all_data.keys()))
+    return frame
+
+# 연도별 DataFrame의 메모리 사용량 합계 (MB)
+def memory_usage_mb(all_data):
+    return sum(df.memory_usage(deep=True).sum() for df in all_data.values()) / 1024 ** 2
+
+# 연도 시트 하나를 읽어 전처리
+def read_year_sheet(book, year):
+    df = book.parse(year)
+    # 데이터 전처리: 2019-2022년 시트에서 쓰던 "교외활동"을 "교외"로 통일
+    df['사고장소'] = df['사고장소'].replace('교외활동', '교외')
+    return add_time_columns(df, year)
+
+# 작업 프로세스에서 시트 하나를 읽고 전처리한 뒤 조회에 쓰는 컬럼만 Arrow IPC 버퍼로 반환
+# (DataFrame 객체를 pickle하지 않고 컬럼 버퍼 그대로 전달, 원본 메모리 사용량도 함께 반환)
+def read_year_sheet_to_arrow(file_path, year):
+    import pyarrow as pa
+
+    with pd.ExcelFile(file_path) as book:
+        df = read_year_sheet(book, year)
+    table = pa.Table.from_pandas(df[QUERY_COLUMNS], preserve_index=False)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes(), int(df.memory_usage(deep=True).sum())
+
+# 연도 시트들을 프로세스 풀에서 동시에 읽음 (openpyxl 파싱은 단일 스레드이므로 시트마다 프로세스 하나)
+# GUI의 작업 스레드에서도 호출되므로 fork 대신 spawn으로 시작 (스레드가 있는 프로세스를 fork하면 잠금 상태가 복사되어 멈출 수 있음)
+def read_year_sheets_parallel(file_path, years, workers):
+    import pyarrow as pa
+
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as executor:
+        results = list(executor.map(read_year_sheet_to_arrow, [file_path] * len(years), years))
+    all_data = {year: pa.ipc.open_stream(buffer).read_all().to_pandas() for year, (buffer, _) in zip(years, results)}
+    return all_data, sum(memory for _, memory in results) / 1024 ** 2
+
+# 원본 엑셀 파일의 연도 시트를 읽어 전처리한 뒤 하나의 DataFrame으로 합침
+# workers: 시트를 읽을 프로세스 수 (None이면 CPU 수와 시트 수 중 작은 값, 1이면 현재 프로세스에서 차례로 읽음)
+def read_workbook(file_path, workers=None):
+    with pd.ExcelFile(file_path) as book:
+        years = find_year_sheets(book.sheet_names)
+        if workers is None:
+            workers = min(len(years), os.cpu_count() or 1)
+        all_data = None
+        if workers > 1:
+            try:
+                all_data, before = read_year_sheets_parallel(file_path, years, workers)
+            except Exception as e:
+                print(f"Error reading sheets in parallel, reading sequentially: {e}")
+        if all_data is None:
+            all_data = {year: read_year_sheet(book, year) for year in years}
+            before = memory_usage_mb(all_data)
+
+    frame = combine_frames(compact_frames(all_data))
+    print(f"메모리 사용량: {before:.1f}MB -> {frame.memory_usage(deep=True).sum() / 1024 ** 2:.1f}MB")
+    return frame
+
+# openpyxl 셀 값을 pd.read_excel과 같은 방식으로 변환 (빈 셀은 "", 정수 값의 숫자는 int)
+# 셀마다 import하지 않도록 openpyxl의 오류/숫자 타입 상수는 호출하는 쪽에서 전달
+def convert_cell(cell, error_type, numeric_type):
+    if cell.value is None:
+        return ''
+    if cell.data_type == error_type:
+        return np.nan
+    if cell.data_type == numeric_type:
+        value = int(cell.value)
+        return value if value == cell.value else float(cell.value)
+    return cell.value
+
+# STREAM_COLUMNS만 담은 행 목록을 pd.read_excel과 같은 파서로 DataFrame 변환 (결측값 처리와 타입 추론이 같음)
+def parse_sheet_rows(rows):
+    from pandas.io.parsers import TextParser
+
+    return TextParser([STREAM_COLUMNS] + rows, header=0, skip_blank_lines=False).read()
+
+# 시트를 chunk_size행씩 DataFrame으로 읽음
+# pd.read_excel처럼 중간의 빈 행은 유지하고 마지막 데이터 행 뒤의 빈 행은 제외
+def iter_sheet_chunks(sheet, chunk_size):
+    from openpyxl.cell.cell import TYPE_ERROR, TYPE_NUMERIC
+
+    rows = sheet.iter_rows()
+    header = [convert_cell(cell, TYPE_ERROR, TYPE_NUMERIC) for cell in next(rows, ())]
+    positions = [header.index(column) for column in STREAM_COLUMNS]
+    chunk = []
+    blank_rows = 0
+    for row in rows:
+        if all(cell.value is None for cell in row):
+            blank_rows += 1
+            continue
+        chunk.extend([''] * len(positions) for _ in range(blank_rows))
+        blank_rows = 0
+        chunk.append([convert_cell(row[i], TYPE_ERROR, TYPE_NUMERIC) if i < len(row) else '' for i in positions])
+        if len(chunk) >= chunk_size:
+            yield parse_sheet_rows(chunk)
+            chunk = []
+    if chunk:
+        yield parse_sheet_rows(chunk)
+
+# 연도 시트 하나를 chunk_size행씩 전처리하여 (지역, 요일, 시, 장소)별 사고건수로 누적
+# 메모리는 시트 행 수가 아니라 chunk_size와 서로 다른 키의 수에 비례
+def count_year_sheet_chunked(sheet, year, chunk_size):
+    counts = pd.DataFrame({**{key: [] for key in COUNT_KEYS}, '사고건수': []})
+    for df in iter_sheet_chunks(sheet, chunk_size):
+        df['사고장소'] = df['사고장소'].replace('교외활동', '교외')
+        df = add_time_columns(df, year)
+        chunk_counts = df.groupby(COUNT_KEYS, dropna=False).size().rename('사고건수').reset_index()
+        counts = pd.concat([counts, chunk_counts], ignore_index=True)
+        counts = counts.groupby(COUNT_KEYS, dropna=False)['사고건수'].sum().reset_index()
+    counts['사고발생시'] = counts['사고발생시'].astype('int8')
+    counts['사고건수'] = counts['사고건수'].astype(np.int64)
+    return counts
+
+# 워크북을 openpyxl 읽기 전용 모드로 열어 연도 시트를 chunk_size행씩 사고건수로 집계한 뒤 하나의 DataFrame으로 합침
+# 행 단위 데이터(사고발생분 포함)는 보관하지 않으며 결과는 키마다 한 행
+def read_workbook_chunked(file_path, chunk_size):
+    from openpyxl import load_workbook
+
+    book = load_workbook(file_path, read_only=True, data_only=True, keep_links=False)
+    try:
+        all_data = {year: count_year_sheet_chunked(book[year], year, chunk_size) for year in find_year_sheets(book.sheetnames)}
+    finally:
+        book.close()
+    return combine_frames(compact_frames(all_data, COUNT_KEYS + ['사고건수']))
+
+# 컬럼 값을 어휘(vocabulary) 인덱스로 변환, 어휘에 없는 값(결측 포함)은 missing_code로
+# 같은 어휘의 범주형 컬럼은 문자열 비교 없이 정수 코드를 그대로 사용
+def encode_column(values, vocabulary, missing_code):
+    if isinstance(values.dtype, pd.CategoricalDtype) and list(values.cat.categories) == vocabulary:
+        codes = values.cat.codes.to_numpy().astype(np.int64)
+    else:
+        codes = pd.Categorical(values, categories=vocabulary).codes.astype(np.int64)
+    codes[codes < 0] = missing_code
+    return codes
+
+# 연도 × 지역 × 요일 × 시간(24) × 사고장소 사고 수 텐서
+# 요일/장소 축의 마지막 칸은 결측값용이며, 지역이나 시간이 결측인 행은 어떤 조회에도 포함되지 않으므로 제외
+# 연도 컬럼이 있는 합친 DataFrame(인덱스 없는 형태)을 bincount 한 번으로 집계
+# 사고건수 컬럼이 있으면(스트리밍 로드의 집계 결과) 각 행을 그 수만큼 셈
+class AccidentCube:
+    # base를 주면 base의 사고 수에 frame의 행을 더한 텐서 (기존 행을 다시 읽지 않음)
+    def __init__(self, frame, base=None):
+        self.years = build_vocabulary([frame], '연도', [], base.years if base else ())
+        self.regions = build_vocabulary([frame], '지역', [], base.regions if base else ())
+        self.days = build_vocabulary([frame], '사고발생요일', DAYS, base.days if base else ())
+        self.places = build_vocabulary([frame], '사고장소', PLACES, base.places if base else ())
+        self.region_index = {region: i for i, region in enumerate(self.regions)}
+        self.day_index = {day: i for i, day in enumerate(self.days)}
+
+        shape = (len(self.years), len(self.regions), len(self.days) + 1, 24, len(self.places) + 1)
+        hours = frame['사고발생시'].to_numpy()
+        region_codes = encode_column(frame['지역'], self.regions, -1)
+        valid = (region_codes >= 0) & (hours >= 0)
+        flat = np.ravel_multi_index((
+            encode_column(frame['연도'], self.years, -1)[valid],
+            region_codes[valid],
+            encode_column(frame['사고발생요일'], self.days, len(self.days))[valid],
+            hours[valid].astype(np.int64),
+            encode_column(frame['사고장소'], self.places, len(self.places))[valid],
+        ), shape)
+        weights = frame['사고건수'].to_numpy()[valid] if '사고건수' in frame else None
+        self.counts = np.bincount(flat, weights, minlength=int(np.prod(shape))).astype(np.int64).reshape(shape)
+
+        # 기존 텐서를 늘어난 축의 해당 위치에 더함 (요일/장소 결측 칸은 마지막 칸끼리)
+        if base is not None:
+            place_index = {place: i for i, place in enumerate(self.places)}
+            self.counts[np.ix_(
+                [self.years.index(year) for year in base.years],
+                [self.region_index[region] for region in base.regions],
+                [self.day_index[day] for day in base.days] + [len(self.days)],
+                range(24),
+                [place_index[place] for place in base.places] + [len(self.places)],
+            )] += base.counts
+
+        # 시간 축 누적합: [start, end) 구간의 합 = cumulative[end] - cumulative[start]
+        self.cumulative = np.zeros(self.counts.shape[:3] + (25,) + self.counts.shape[4:], dtype=np.int64)
+        np.cumsum(self.counts, axis=3, out=self.cumulative[:, :, :, 1:])
+
+    # 지역과 시간대 [start_hour, end_hour)의 연도 × 요일 × 장소 사고 수 (day를 주면 연도 × 장소)
+    def window(self, region, start_hour, end_hour, day=None):
+        return self.windows(region, [(start_hour, end_hour)], day)[0]
+
+    # 여러 시간대 [start, end)의 사고 수를 누적합 인덱싱 한 번으로 계산
+    # 시간대 × 연도 × 요일 × 장소 (day를 주면 시간대 × 연도 × 장소)
+    def windows(self, region, hour_windows, day=None):
+        bounds = np.clip(np.asarray(hour_windows, dtype=np.int64).reshape(-1, 2), 0, 24)
+        starts, ends = bounds[:, 0], bounds[:, 1]
+        shape = (len(bounds), len(self.years), len(self.days) + 1, len(self.places) + 1)
+        if region not in self.region_index:
+            counts = np.zeros(shape, dtype=np.int64)
+        else:
+            cumulative = self.cumulative[:, self.region_index[region]]
+            counts = (cumulative[:, :, ends] - cumulative[:, :, starts]).transpose(2, 0, 1, 3)
+            counts[ends <= starts] = 0
+
+        if day is None:
+            return counts
+        if day not in self.day_index:
+            return np.zeros((shape[0], shape[1], shape[3]), dtype=np.int64)
+        return counts[:, :, self.day_index[day]]
+
+    # 여러 지역의 시간대 [start_hour, end_hour) 사고 수를 한 번에 계산 (데이터에 없는 지역은 0)
+    # 연도 × 지역 × 요일 × 장소 (day를 주면 연도 × 지역 × 장소)
+    def regions_window(self, regions, start_hour, end_hour, day=None):
+        start, end = np.clip([start_hour, end_hour], 0, 24)
+        index = np.array([self.region_index.get(region, -1) for region in regions], dtype=np.int64)
+        known = index >= 0
+        counts = np.zeros((len(self.years), len(index), len(self.days) + 1, len(self.places) + 1), dtype=np.int64)
+        if end > start:
+            counts[:, known] = (self.cumulative[:, :, :, end] - self.cumulative[:, :, :, start])[:, index[known]]
+
+        if day is None:
+            return counts
+        if day not in self.day_index:
+            return np.zeros(counts.shape[:2] + counts.shape[3:], dtype=np.int64)
+        return counts[:, :, self.day_index[day]]
+
+    # 지역과 요일의 연도 × 시간 × 장소 사고 수
+    def hourly(self, region, day):
+        if region not in self.region_index or day not in self.day_index:
+            return np.zeros((len(self.years), 24, len(self.places) + 1), dtype=np.int64)
+        return self.counts[:, self.region_index[region], self.day_index[day]]
+
+    # 장소 축에서 고정 장소 목록(PLACES)의 사고 수와 장소가 기록된 사고의 총합
+    def place_counts(self, counts):
+        return counts[..., :len(PLACES)], counts[..., :-1].sum(axis=-1)
+
+    # 장소 축을 고정 장소별 비율(%)로 한 번에 변환 (총합이 0인 칸은 0)
+    def place_percentages(self, counts):
+        place_counts, totals = self.place_counts(counts)
+        percentages = np.zeros(place_counts.shape)
+        np.divide(place_counts, totals[..., None], out=percentages, where=totals[..., None] > 0)
+        return percentages * 100, totals
+
+# 연도별 사고 수 시계열들을 최소제곱 직선으로 한 번에 적합하여 target_year의 값을 예측
+# counts의 첫 번째 축이 연도이고 나머지 축의 모든 시계열이 같은 연도 설계 행렬을 공유하므로 행렬 연산 한 번으로 계산
+# (LinearRegression().fit(X, y).predict([[target_year]])과 같은 결과)
+def forecast_linear(years, counts, target_year):
+    with stage('fit'):
+        x = np.asarray(years, dtype=np.float64)
+        y = np.asarray(counts, dtype=np.float64)
+        x_centered = x - x.mean()
+        y_mean = y.mean(axis=0)
+        denominator = x_centered @ x_centered
+        if denominator == 0:
+            return y_mean
+        slope = np.tensordot(x_centered, y - y_mean, axes=1) / denominator
+        return y_mean + slope * (target_year - x.mean())
+
+# 조회 결과 LRU 캐시: 결과 크기(pickle 기준)의 합이 max_bytes를 넘으면 가장 오래 쓰지 않은 결과부터 제거
+# 작업 스레드에서 조회하므로 잠금으로 보호하며, 반환된 결과는 여러 조회가 공유하므로 수정하면 안 됨
+class ResultCache:
+    def __init__(self, max_bytes=RESULT_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        # 무효화할 때마다 증가, 계산 도중 무효화된 결과는 저장하지 않음
+        self.generation = 0
+        self.lock = threading.Lock()
+
+    def get_or_compute(self, key, compute):
+        # 한도가 0이면 캐시를 쓰지 않음 (결과 크기 계산도 생략)
+        if self.max_bytes <= 0:
+            with self.lock:
+                self.misses += 1
+            return compute()
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return self.entries[key][0]
+            self.misses += 1
+            generation = self.generation
+
+        value = compute()
+        size = len(pickle.dumps(value))
+        with self.lock:
+            if size <= self.max_bytes and key not in self.entries and generation == self.generation:
+                self.entries[key] = (value, size)
+                self.total_bytes += size
+                while self.total_bytes > self.max_bytes:
+                    _, (_, evicted_size) = self.entries.popitem(last=False)
+                    self.total_bytes -= evicted_size
+        return value
+
+    def clear(self):
+        with self.lock:
+            self.generation += 1
+            self.entries.clear()
+            self.total_bytes = 0
+
+    # 키의 첫 번째 값(지역)이 regions에 속하는 결과만 제거
+    def invalidate(self, regions):
+        with self.lock:
+            self.generation += 1
+            for key in [key for key in self.entries if key[0] in regions]:
+                _, size = self.entries.pop(key)
+                self.total_bytes -= size
+
+    def summary(self):
+        return f"캐시 적중 {self.hits}회 / 미적중 {self.misses}회 ({len(self.entries)}개, {self.total_bytes / 1024:.0f}KB)"
+
+# 조회 함수 func(data, region, ...)의 결과를 data.result_cache에 (지역, 함수, 나머지 인자) 키로 저장 (리스트 인자는 튜플로 변환)
+def cached_query(func):
+    @functools.wraps(func)
+    def wrapper(data, region, *args):
+        key = (region, func.__module__, func.__qualname__) + tuple(tuple(map(tuple, arg)) if isinstance(arg, list) else arg for arg in args)
+        return data.result_cache.get_or_compute(key, lambda: func(data, region, *args))
+    return wrapper
+
+# 로드된 사고 데이터: (지역, 요일, 연도)로 정렬된 인덱스의 DataFrame과 이를 집계한 사고 수 텐서
+# 조회 결과 캐시는 데이터와 함께 만들어지므로 새 워크북을 로드하면 이전 결과는 사용되지 않음
+# 조회 함수는 시작할 때 data.cube를 한 번 읽으므로, append가 텐서를 교체해도 진행 중인 조회는 이전 텐서로 끝남
+# cube만 주면 행 단위 데이터 없이 이미 만든 텐서로 조회만 함 (배치 작업 프로세스용, frame과 rows()는 사용할 수 없음)
+class AccidentData:
+    def __init__(self, frame=None, result_cache_bytes=RESULT_CACHE_BYTES, cube=None):
+        self.cube = cube if cube is not None else AccidentCube(frame)
+        # 처음 로드한 행과 append로 추가한 행 (인덱스 없는 형태 그대로 보관)
+        self.parts = [] if frame is None else [frame]
+        # (지역, 요일, 연도)로 정렬된 인덱스의 DataFrame: 조회는 텐서만 사용하므로 frame/rows()에 처음 접근할 때 만듦
+        self.indexed = None
+        self.result_cache = ResultCache(result_cache_bytes)
+        # append끼리, 그리고 append와 인덱스 생성이 같은 데이터를 동시에 바꾸지 않도록 한 번에 하나씩 실행
+        # (동시에 실행된 append가 같은 텐서를 기준으로 만들면 한쪽의 행을 잃음)
+        self.lock = threading.Lock()
+
+    # 새 행(read_workbook과 같은 형태의 합친 DataFrame)을 추가하고 사고 수 텐서와 결과 캐시를 갱신
+    # 비용은 새 행 수와 텐서 크기에 비례하며 기존 행은 다시 읽지 않음
+    def append(self, frame):
+        with self.lock:
+            old_years = self.years
+            with stage('aggregate'):
+                self.cube = AccidentCube(frame, base=self.cube)
+                self.parts.append(frame)
+
+            # 연도가 늘면 예측 대상 연도와 모든 시계열이 바뀌므로 전체를, 아니면 새 행이 있는 지역의 결과만 무효화
+            if self.years != old_years:
+                self.result_cache.clear()
+            else:
+                self.result_cache.invalidate(set(frame['지역'].dropna().unique()))
+
+    # 워크북의 연도 시트(새 연도 또는 기존 연도의 추가분)를 읽어 추가
+    def append_workbook(self, file_path, workers=None):
+        with stage('load'):
+            frame = read_workbook(file_path, workers)
+        self.append(frame)
+
+    # 추가된 행까지 합쳐 (지역, 요일, 연도)로 정렬된 인덱스의 DataFrame (범주는 텐서의 어휘로 통일)
+    # 처음 접근할 때와 append 뒤 다시 접근할 때만 만들며, 만든 뒤에는 인덱스 없는 행을 보관하지 않음
+    @property
+    def frame(self):
+        with self.lock:
+            if self.parts:
+                flats = ([] if self.indexed is None else [self.indexed.reset_index()]) + self.parts
+                flat = flats[0]
+                if len(flats) > 1:
+                    flat = pd.concat(flats, ignore_index=True)
+                    cube = self.cube
+                    for column, vocabulary in [('연도', cube.years), ('지역', cube.regions), ('사고발생요일', cube.days), ('사고장소', cube.places)]:
+                        flat[column] = pd.Categorical(flat[column], categories=vocabulary)
+                # 결측 지역/요일(코드 -1)을 앞에 두어야 인덱스 전체가 정렬된 상태가 되어 rows()가 이진 탐색으로 조회
+                self.indexed = flat.set_index(INDEX_COLUMNS).sort_index(na_position='first')
+                self.parts = []
+            if self.indexed is None:
+                raise ValueError("사고 수 텐서만으로 만든 데이터에는 행 단위 데이터가 없습니다")
+            return self.indexed
+
+    @property
+    def years(self):
+        return self.cube.years
+
+    # 예측 대상 연도 (마지막 연도의 다음 해)
+    @property
+    def forecast_year(self):
+        return int(self.years[-1]) + 1
+
+    # 인덱스로 지역(과 요일, 연도)에 해당하는 행만 조회 (전체 행을 훑지 않음)
+    # 스트리밍 로드한 데이터는 사고 한 건이 아니라 (지역, 요일, 시, 장소)별 사고건수 한 행
+    def rows(self, region, day=None, year=None):
+        frame = self.frame
+        key = (region, slice(None) if day is None else day, slice(None) if year is None else year)
+        try:
+            return frame.loc[key, :]
+        except KeyError:
+            return frame.iloc[:0]
+
+# 캐시 폴더: 엑셀 파일 옆의 "<파일명>.cache"
+def get_cache_dir(file_path):
+    return file_path + '.cache'
+
+# 파일 경로, 수정 시각, 크기로 캐시 키 생성
+def get_file_signature(file_path):
+    stat = os.stat(file_path)
+    return {
+        'path': os.path.abspath(file_path),
+        'mtime': stat.st_mtime_ns,
+        'size': stat.st_size,
+        'version': CACHE_VERSION,
+    }
+
+# 캐시가 원본과 일치하면 합친 DataFrame을 Parquet에서 읽어옴
+def load_cached_data(file_path, name='data'):
+    cache_dir = get_cache_dir(file_path)
+    meta_path = os.path.join(cache_dir, f'{name}.json')
+    if not os.path.exists(meta_path):
+        return None
+
+    try:
+        with open(meta_path, encoding='utf-8') as f:
+            meta = json.load(f)
+        if meta['signature'] != get_file_signature(file_path):
+            return None
+        return pd.read_parquet(os.path.join(cache_dir, f'{name}.parquet'))
+    except Exception as e:
+        print(f"Error reading cache {cache_dir}: {e}")
+        return None
+
+# 전처리가 끝난 DataFrame을 Parquet 파일로 저장
+def save_cached_data(file_path, frame, name='data'):
+    cache_dir = get_cache_dir(file_path)
+    meta_path = os.path.join(cache_dir, f'{name}.json')
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        # 저장 도중 중단되어도 잘못된 캐시를 읽지 않도록 메타 파일(<name>.json)은 마지막에 기록
+        if os.path.exists(meta_path):
+            os.remove(meta_path)
+        frame.to_parquet(os.path.join(cache_dir, f'{name}.parquet'), index=False)
+        meta = {'signature': get_file_signature(file_path)}
+        with open(meta_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False)
+    except Exception as e:
+        print(f"Error writing cache {cache_dir}: {e}")
+
+# 데이터 로드 및 전처리 (캐시가 있으면 엑셀 파싱을 건너뜀)
+# chunk_size를 주면 시트를 chunk_size행씩 읽어 바로 사고건수로 집계 (메모리보다 큰 워크북용, 조회 결과는 같음)
+def load_and_preprocess_data(file_path, use_cache=True, result_cache_bytes=RESULT_CACHE_BYTES, workers=None, chunk_size=None):
+    start_time = time.perf_counter()
+    cache_name = 'data' if chunk_size is None else 'counts'
+    profiler.reset()
+
+    with stage('load'):
+        frame = load_cached_data(file_path, cache_name) if use_cache else None
+        if frame is not None:
+            source = '캐시'
+        else:
+            if chunk_size is None:
+                frame = read_workbook(file_path, workers)
+                source = '엑셀'
+            else:
+                frame = read_workbook_chunked(file_path, chunk_size)
+                source = f'엑셀, {chunk_size}행 단위'
+            if use_cache:
+                save_cached_data(file_path, frame, cache_name)
+
+    elapsed = time.perf_counter() - start_time
+    print(f"데이터 로드 완료 ({source}): {elapsed:.2f}초")
+    bad = frame['사고발생시'] < 0
+    rows = frame.loc[bad, '사고건수'] if '사고건수' in frame else pd.Series(1, index=frame.index[bad])
+    bad_rows = rows.groupby(frame.loc[bad, '연도'], observed=False).sum()
+    for year, count in bad_rows.items():
+        if count > 0:
+            print(f"{year}년: 사고발생시각을 해석할 수 없는 행 {count}건 제외")
+    with stage('aggregate'):
+        data = AccidentData(frame, result_cache_bytes)
+    if profiler.enabled:
+        print(f"단계별 시간/메모리: {profiler.summary()}")
+    return data
@@ -0,0 +1,92 @@
+import os
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip('PyQt5')
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PyQt5.QtWidgets import QApplication
+from queries import get_hourly_accident_counts_and_place_distribution, predict_next_year_accidents
+from school_data import PLACES, AccidentData
+import dashboard
+
+YEARS = ['2022', '2023']
+COMBOS = [('서울', '월'), ('부산', '화')]
+
+
+@pytest.fixture(scope='module')
+def app():
+    return QApplication.instance() or QApplication([])
+
+# 서울 월요일 22시에 연도마다 1, 2건, 부산 화요일 23시에 2023년 1건
+@pytest.fixture
+def window(app):
+    frame = pd.DataFrame({
+        '연도': pd.Categorical(['2022', '2023', '2023', '2023'], categories=YEARS),
+        '지역': ['서울', '서울', '서울', '부산'],
+        '사고발생요일': ['월', '월', '월', '화'],
+        '사고발생시': np.array([22, 22, 22, 23], dtype=np.int8),
+        '사고장소': [PLACES[0], PLACES[0], PLACES[1], PLACES[0]],
+    })
+    window = dashboard.MainWindow(AccidentData(frame))
+    yield window
+    window.close()
+
+def render(window, start_hour, combos):
+    results = []
+    for region, day in combos:
+        counts, place_distribution = get_hourly_accident_counts_and_place_distribution(window.data, region, start_hour, day)
+        results.append((counts, place_distribution, predict_next_year_accidents(counts)))
+    window.render_accident_counts(start_hour, combos, results)
+    return window.result_model
+
+def cell(model, row, col):
+    return model.data(model.index(row, col))
+
+
+def test_model_without_rows(app):
+    model = dashboard.ResultTableModel()
+    model.set_result(['구분'] + YEARS + ['2024 예측'], [], 22, PLACES, np.empty((0, len(YEARS) + 1)))
+    assert model.rowCount() == 0
+    assert model.columnCount() == len(YEARS) + 2
+
+def test_render_start_hour_past_end(window):
+    model = render(window, 24, COMBOS)
+    assert model.rowCount() == 0
+    assert window.has_result
+
+def test_render_combos(window):
+    model = render(window, 22, COMBOS)
+    rows_per_hour = 2 + len(PLACES)
+    assert model.rowCount() == len(COMBOS) * 2 * rows_per_hour
+    assert [model.headerData(col, dashboard.Qt.Horizontal) for col in range(model.columnCount())] == ['구분'] + YEARS + ['2024 예측']
+
+    # 서울 월요일 22시: 사고 수, 비율 머리글, 장소별 비율
+    assert cell(model, 0, 0) == '서울 월요일 22시-23시 사고 수'
+    assert [cell(model, 0, col) for col in range(1, 4)] == ['1', '2', '3']
+    assert cell(model, 1, 0) == '서울 월요일 22시-23시 장소별 비율 (%)'
+    assert [cell(model, 1, col) for col in range(1, 4)] == [None, None, None]
+    assert cell(model, 2, 0) == PLACES[0]
+    assert [cell(model, 2, col) for col in range(1, 4)] == ['100.00', '50.00', None]
+    assert [cell(model, 3, col) for col in range(1, 3)] == ['0.00', '50.00']
+
+    # 두 번째 조합은 시간 블록 두 개 뒤에서 시작
+    start = 2 * rows_per_hour
+    assert cell(model, start, 0) == '부산 화요일 22시-23시 사고 수'
+    assert cell(model, start + rows_per_hour, 0) == '부산 화요일 23시-24시 사고 수'
+    assert [cell(model, start + rows_per_hour, col) for col in range(1, 3)] == ['0', '1']
+
+def test_render_single_combo_has_no_prefix(window):
+    model = render(window, 23, COMBOS[:1])
+    assert model.rowCount() == 2 + len(PLACES)
+    assert cell(model, 0, 0) == '23시-24시 사고 수'
+
+@pytest.mark.parametrize('text', ['24', '-1', '', '아홉'])
+def test_invalid_start_hour(window, text):
+    window.region_input.setText('서울')
+    window.day_input.setText('월')
+    window.start_hour_input.setText(text)
+    window.show_accident_counts()
+    assert window.statusBar().currentMessage() == "시작 시간은 0-23 사이의 정수여야 합니다"
+    assert window.result_model.rowCount() == 0
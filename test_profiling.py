@@ -0,0 +1,54 @@
+import tracemalloc
+import numpy as np
+import pytest
+from profiling import Profiler
+
+MB = 1024 ** 2
+
+
+@pytest.fixture
+def profiler():
+    profiler = Profiler(enabled=True)
+    yield profiler
+    tracemalloc.stop()
+
+def records(profiler):
+    return {name: (allocated, peak) for name, _, allocated, peak in profiler.records}
+
+# NumPy 버퍼도 tracemalloc에 잡히므로 남긴 배열은 순증가량에, 버린 임시 배열은 최대 사용량에만 나타남
+def test_allocated_and_peak_bytes(profiler):
+    with profiler.stage('aggregate'):
+        kept = np.ones(2 * MB // 8)
+    with profiler.stage('fit'):
+        np.ones(4 * MB // 8).sum()
+    allocated, peak = records(profiler)['aggregate']
+    assert allocated >= 2 * MB and peak >= 2 * MB
+    allocated, peak = records(profiler)['fit']
+    assert abs(allocated) < MB and peak >= 4 * MB
+    del kept
+
+# 안쪽 단계가 최대값을 초기화해도 바깥 단계의 최대 사용량은 유지
+def test_nested_stage_keeps_outer_peak(profiler):
+    with profiler.stage('filter'):
+        np.ones(4 * MB // 8).sum()
+        with profiler.stage('fit'):
+            np.ones(MB // 8).sum()
+    assert records(profiler)['filter'][1] >= 4 * MB
+    assert MB <= records(profiler)['fit'][1] < 4 * MB
+
+def test_summary(profiler):
+    with profiler.stage('load'):
+        kept = np.ones(MB // 8)
+    with profiler.stage('step'):
+        pass
+    summary = profiler.summary()
+    assert summary.startswith('load ') and '/+1024.' in summary and '/최대 1024.' in summary and 'step' not in summary
+    profiler.reset()
+    assert profiler.summary() == ''
+    del kept
+
+def test_disabled_profiler_has_no_summary():
+    profiler = Profiler()
+    with profiler.stage('load'):
+        pass
+    assert profiler.summary() == '' and profiler.records == []
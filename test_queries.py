@@ -0,0 +1,329 @@
+from fractions import Fraction
+import numpy as np
+import pandas as pd
+import pytest
+import queries
+from queries import predict_next_year_accidents
+from school_data import PLACES, DAYS, load_and_preprocess_data
+
+YEARS = ['2019', '2020', '2021', '2022', '2023']
+
+
+# 정확한 유리수 연산으로 계산한 최소제곱 직선의 다음 해 값 (버림, 음수는 0)
+def exact_forecast(years, values):
+    x = [Fraction(int(year)) for year in years]
+    y = [Fraction(int(value)) for value in values]
+    x_mean = sum(x) / len(x)
+    y_mean = sum(y) / len(y)
+    slope = sum((xi - x_mean) * (yi - y_mean) for xi, yi in zip(x, y)) / sum((xi - x_mean) ** 2 for xi in x)
+    return max(0, int(y_mean + slope * (int(years[-1]) + 1 - x_mean)))
+
+# 변경 전 방식: 시간마다 LinearRegression을 적합하여 다음 해 예측 (정수 경계의 오차만 같은 기준으로 보정)
+def sklearn_forecast(counts, hour):
+    from sklearn.linear_model import LinearRegression
+
+    years = list(counts.keys())
+    X = np.array([[int(year), hour] for year in years])
+    y = np.array([counts[year].get(hour, 0) for year in years])
+    pred = LinearRegression().fit(X, y).predict([[int(years[-1]) + 1, hour]])[0]
+    return max(0, int(np.floor(pred + 1e-9)))
+
+def hourly_counts(series):
+    return {year: {hour: int(series[i, hour]) for hour in range(24)} for i, year in enumerate(YEARS)}
+
+
+# 정확한 예측이 정수인데 부동소수점으로는 정수 바로 아래가 되는 경우 (예: [8, 2, 3, 4, 6] -> 4)
+def test_predict_next_year_accidents_whole_number_forecast():
+    series = np.tile(np.array([8, 2, 3, 4, 6])[:, None], (1, 24))
+    predictions = predict_next_year_accidents(hourly_counts(series))
+    assert predictions == {hour: 4 for hour in range(24)}
+
+@pytest.mark.parametrize('seed', range(20))
+def test_predict_next_year_accidents_matches_exact_and_sklearn(seed):
+    pytest.importorskip('sklearn')
+    series = np.random.default_rng(seed).integers(0, 30, (len(YEARS), 24))
+    counts = hourly_counts(series)
+    predictions = predict_next_year_accidents(counts)
+    assert predictions == {hour: exact_forecast(YEARS, series[:, hour]) for hour in range(24)}
+    assert predictions == {hour: sklearn_forecast(counts, hour) for hour in range(24)}
+
+
+# ---- 모든 로드 방식의 조회/예측 결과를 변경 전 방식(연도 시트마다 필터링)과 비교 ----
+
+REGIONS = ['서울', '부산', '제주']
+# 해석할 수 없는 시각, 고정 목록 밖의 장소/요일, 빈 칸을 포함
+TIMES = ['08:15', '09:40', '12:05', '13:30', '17:55', '23:10', '00:20', '25:00', '시간미상', None]
+EXTRA_DAYS = ['월요일', None]
+EXTRA_PLACES = ['기타', None]
+QUERY_REGIONS = REGIONS + ['없는지역']
+QUERY_DAYS = ['월', '일', '월요일']
+HOUR_WINDOWS = [(0, 24), (8, 13), (23, 24), (22, 3)]
+
+
+# 연도 시트마다 rows행의 가상 워크북 (2019-2022년 시트에는 "교외활동" 포함)
+@pytest.fixture(scope='module')
+def workbook(tmp_path_factory):
+    rng = np.random.default_rng(0)
+    file_path = tmp_path_factory.mktemp('data') / 'schoolData.xlsx'
+    rows = 300
+    with pd.ExcelWriter(file_path) as writer:
+        for y, year in enumerate(YEARS):
+            places = PLACES + EXTRA_PLACES + (['교외활동'] if year != '2023' else [])
+            df = pd.DataFrame({
+                '연번': range(rows),
+                '지역': rng.choice(REGIONS, rows),
+                '사고발생요일': rng.choice(DAYS + EXTRA_DAYS, rows, p=[0.13] * 7 + [0.05, 0.04]),
+                '사고발생시각': rng.choice(np.array(TIMES, dtype=object), rows),
+                # 연도마다 장소 비율이 달라지도록 (예측 값이 0이 아니게)
+                '사고장소': rng.choice(places, rows + y * 40)[:rows],
+            })
+            df.to_excel(writer, sheet_name=year, index=False)
+    return str(file_path)
+
+# 변경 전 load_and_preprocess_data: 시트를 그대로 읽고 2019-2022년의 "교외활동"을 "교외"로 변경
+@pytest.fixture(scope='module')
+def baseline(workbook):
+    all_data = {}
+    for year in YEARS:
+        df = pd.read_excel(workbook, sheet_name=year)
+        if year != '2023':
+            df['사고장소'] = df['사고장소'].replace('교외활동', '교외')
+        df['사고발생시각'] = pd.to_datetime(df['사고발생시각'], format='%H:%M', errors='coerce').dt.hour
+        all_data[year] = df
+    return all_data
+
+# 처음 로드에서 캐시 파일을 만들고 두 번째 로드는 캐시에서 읽음
+def load_from_cache(file_path):
+    load_and_preprocess_data(file_path)
+    return load_and_preprocess_data(file_path)
+
+# 비교할 로드 방식: 이름 -> 워크북 경로로 AccidentData를 만드는 함수
+LOADERS = {
+    'workers=1': lambda file_path: load_and_preprocess_data(file_path, use_cache=False, workers=1),
+    'workers=2': lambda file_path: load_and_preprocess_data(file_path, use_cache=False, workers=2),
+    'chunk_size': lambda file_path: load_and_preprocess_data(file_path, use_cache=False, chunk_size=7),
+    'cache': load_from_cache,
+}
+
+@pytest.fixture(scope='module', params=list(LOADERS))
+def data(request, workbook):
+    return LOADERS[request.param](workbook)
+
+# 중첩된 dict/tuple을 비교 (키는 같아야 하고 숫자는 부동소수점 오차 허용)
+def assert_close(actual, expected):
+    if isinstance(expected, dict):
+        assert isinstance(actual, dict) and set(actual) == set(expected)
+        for key in expected:
+            assert_close(actual[key], expected[key])
+    elif isinstance(expected, (tuple, list)):
+        assert len(actual) == len(expected)
+        for a, e in zip(actual, expected):
+            assert_close(a, e)
+    else:
+        assert actual == pytest.approx(expected, abs=1e-9)
+
+def place_percentages(place_counts):
+    total = place_counts.sum()
+    if total > 0:
+        return {place: (place_counts.get(place, 0) / total) * 100 for place in PLACES}
+    return {place: 0 for place in PLACES}
+
+# 변경 전 school.py
+def baseline_daily(all_data, region, start_hour, end_hour):
+    counts, place_distribution, day_distribution = {}, {}, {}
+    for year, df in all_data.items():
+        filtered = df[(df['지역'] == region) & (df['사고발생시각'] >= start_hour) & (df['사고발생시각'] < end_hour)]
+        counts[year] = len(filtered)
+        place_distribution[year] = place_percentages(filtered['사고장소'].value_counts())
+        day_distribution[year] = {}
+        for day in DAYS:
+            day_df = filtered[filtered['사고발생요일'] == day]
+            day_place_counts = day_df['사고장소'].value_counts()
+            day_distribution[year][day] = {
+                'count': len(day_df) if day_place_counts.sum() > 0 else 0,
+                'places': place_percentages(day_place_counts),
+            }
+    return counts, place_distribution, day_distribution
+
+def baseline_filter(df, region, day, start_hour, end_hour):
+    return df[(df['지역'] == region) & (df['사고발생요일'] == day) & (df['사고발생시각'] >= start_hour) & (df['사고발생시각'] < end_hour)]
+
+# 변경 전 analysis.py의 조회
+def baseline_counts(all_data, region, day, start_hour, end_hour):
+    counts, place_distribution, place_counts_total = {}, {}, {}
+    for year, df in all_data.items():
+        filtered = baseline_filter(df, region, day, start_hour, end_hour)
+        counts[year] = len(filtered)
+        place_counts = filtered['사고장소'].value_counts()
+        place_counts_total[year] = place_counts.to_dict()
+        place_distribution[year] = place_percentages(place_counts)
+    return counts, place_distribution, place_counts_total
+
+# 변경 전 analysis.py의 장소별 LinearRegression 예측
+def baseline_predict(all_data, region, day, start_hour, end_hour):
+    from sklearn.linear_model import LinearRegression
+
+    X = np.array([int(year) for year in all_data]).reshape(-1, 1)
+    predicted_counts = {}
+    for place in PLACES:
+        y = np.array([baseline_filter(df, region, day, start_hour, end_hour)['사고장소'].value_counts().get(place, 0) for df in all_data.values()])
+        predicted_counts[place] = LinearRegression().fit(X, y).predict(np.array([[2024]]))[0]
+    total = sum(predicted_counts.values())
+    return predicted_counts, total, {place: (count / total) * 100 if total > 0 else 0 for place, count in predicted_counts.items()}
+
+# 변경 전 dashboard.py의 조회
+def baseline_hourly(all_data, region, start_hour, day):
+    counts, place_distribution = {}, {}
+    for year, df in all_data.items():
+        df = df[df['사고발생요일'] == day]
+        counts[year], place_distribution[year] = {}, {}
+        for hour in range(start_hour, 24):
+            filtered = df[(df['지역'] == region) & (df['사고발생시각'] == hour)]
+            counts[year][hour] = len(filtered)
+            place_distribution[year][hour] = place_percentages(filtered['사고장소'].value_counts())
+    return counts, place_distribution
+
+
+@pytest.mark.parametrize('region', QUERY_REGIONS)
+@pytest.mark.parametrize('start_hour, end_hour', HOUR_WINDOWS)
+def test_daily_counts(data, baseline, region, start_hour, end_hour):
+    actual = queries.get_daily_accident_counts_and_place_distribution(data, region, start_hour, end_hour)
+    assert_close(actual, baseline_daily(baseline, region, start_hour, end_hour))
+
+@pytest.mark.parametrize('region', QUERY_REGIONS)
+@pytest.mark.parametrize('day', QUERY_DAYS)
+@pytest.mark.parametrize('start_hour, end_hour', HOUR_WINDOWS)
+def test_counts(data, baseline, region, day, start_hour, end_hour):
+    actual = queries.get_accident_counts_and_place_distribution(data, region, day, start_hour, end_hour)
+    assert_close(actual, baseline_counts(baseline, region, day, start_hour, end_hour))
+
+@pytest.mark.parametrize('region', QUERY_REGIONS)
+@pytest.mark.parametrize('day', QUERY_DAYS)
+@pytest.mark.parametrize('start_hour, end_hour', HOUR_WINDOWS)
+def test_predictions(data, baseline, region, day, start_hour, end_hour):
+    pytest.importorskip('sklearn')
+    assert_close(queries.predict_accidents_by_place(data, region, day, start_hour, end_hour),
+                 baseline_predict(baseline, region, day, start_hour, end_hour))
+
+@pytest.mark.parametrize('region', QUERY_REGIONS)
+@pytest.mark.parametrize('day', QUERY_DAYS)
+def test_predict_windows(data, baseline, region, day):
+    pytest.importorskip('sklearn')
+    forecasts = queries.predict_accidents_by_place_windows(data, region, day, HOUR_WINDOWS)
+    assert_close(forecasts, [baseline_predict(baseline, region, day, start, end) for start, end in HOUR_WINDOWS])
+
+@pytest.mark.parametrize('region', QUERY_REGIONS)
+@pytest.mark.parametrize('day', QUERY_DAYS)
+@pytest.mark.parametrize('start_hour', [0, 9, 23])
+def test_hourly_counts(data, baseline, region, day, start_hour):
+    counts, place_distribution = queries.get_hourly_accident_counts_and_place_distribution(data, region, start_hour, day)
+    expected_counts, expected_distribution = baseline_hourly(baseline, region, start_hour, day)
+    assert counts == expected_counts
+    assert_close(place_distribution, expected_distribution)
+
+@pytest.mark.parametrize('region', QUERY_REGIONS)
+@pytest.mark.parametrize('day', QUERY_DAYS)
+def test_hourly_forecast(data, region, day):
+    pytest.importorskip('sklearn')
+    counts, _ = queries.get_hourly_accident_counts_and_place_distribution(data, region, 0, day)
+    assert predict_next_year_accidents(counts) == {hour: sklearn_forecast(counts, hour) for hour in range(24)}
+
+# 스트리밍 로드는 (지역, 요일, 시, 장소)별 사고건수 한 행이므로 사고건수의 합으로 비교
+@pytest.mark.parametrize('region', QUERY_REGIONS)
+@pytest.mark.parametrize('day', QUERY_DAYS)
+def test_rows(data, baseline, region, day):
+    for year, df in baseline.items():
+        rows = data.rows(region, day, year)
+        expected = len(df[(df['지역'] == region) & (df['사고발생요일'] == day)])
+        assert (rows['사고건수'].sum() if '사고건수' in rows else len(rows)) == expected
+
+@pytest.mark.parametrize('day', QUERY_DAYS)
+@pytest.mark.parametrize('start_hour, end_hour', HOUR_WINDOWS)
+def test_compare_regions(data, baseline, day, start_hour, end_hour):
+    pytest.importorskip('sklearn')
+    counts, place_distribution, forecasts, ranking = queries.compare_regions(data, day, start_hour, end_hour, QUERY_REGIONS, top_k=2)
+    growth = {}
+    for region in QUERY_REGIONS:
+        expected_counts, expected_distribution, place_counts_total = baseline_counts(baseline, region, day, start_hour, end_hour)
+        expected_forecast = baseline_predict(baseline, region, day, start_hour, end_hour)
+        assert counts[region] == expected_counts
+        assert_close(place_distribution[region], expected_distribution)
+        assert_close(forecasts[region], expected_forecast)
+        growth[region] = expected_forecast[1] - sum(place_counts_total['2023'].get(place, 0) for place in PLACES)
+    expected_ranking = sorted(QUERY_REGIONS, key=lambda region: -growth[region])[:2]
+    assert [region for region, _ in ranking] == expected_ranking
+    assert_close([value for _, value in ranking], [growth[region] for region in expected_ranking])
+
+# ---- 워크북 추가(append)는 합친 워크북을 처음부터 로드한 것과 같아야 함 ----
+
+def random_sheet(rng, rows, regions, places=PLACES, days=DAYS):
+    return pd.DataFrame({
+        '연번': range(rows),
+        '지역': rng.choice(regions, rows),
+        '사고발생요일': rng.choice(days, rows),
+        '사고발생시각': rng.choice(np.array(TIMES, dtype=object), rows),
+        '사고장소': rng.choice(places, rows),
+    })
+
+def write_workbook(file_path, sheets):
+    with pd.ExcelWriter(file_path) as writer:
+        for year, df in sheets.items():
+            df.to_excel(writer, sheet_name=year, index=False)
+    return str(file_path)
+
+# 기존 워크북, 추가할 워크북, 둘을 연도 시트마다 이어 붙인 워크북
+def append_workbooks(tmp_path, extra_sheets):
+    rng = np.random.default_rng(1)
+    base_sheets = {year: random_sheet(rng, 120, ['서울', '부산']) for year in ['2021', '2022']}
+    extra_sheets = {year: make(rng) for year, make in extra_sheets.items()}
+    merged_sheets = {year: pd.concat([sheets[year] for sheets in (base_sheets, extra_sheets) if year in sheets])
+                     for year in sorted({*base_sheets, *extra_sheets})}
+    return (write_workbook(tmp_path / 'base.xlsx', base_sheets), write_workbook(tmp_path / 'extra.xlsx', extra_sheets),
+            write_workbook(tmp_path / 'merged.xlsx', merged_sheets))
+
+def load(file_path):
+    return load_and_preprocess_data(file_path, use_cache=False, workers=1)
+
+def query_all(data, regions):
+    results = []
+    for region in regions:
+        results.append(queries.get_daily_accident_counts_and_place_distribution(data, region, 8, 13))
+        for day in ['월', '일', '월요일']:
+            results.append(queries.get_accident_counts_and_place_distribution(data, region, day, 0, 24))
+            results.append(queries.predict_accidents_by_place_windows(data, region, day, [(0, 24), (8, 13)]))
+            results.append(queries.get_hourly_accident_counts_and_place_distribution(data, region, 9, day))
+    return results
+
+# 기존 연도의 추가분(새 지역, 고정 목록 밖의 장소/요일)과 새 연도를 추가
+def test_append_matches_merged_load(tmp_path):
+    base, extra, merged = append_workbooks(tmp_path, {
+        '2022': lambda rng: random_sheet(rng, 60, ['부산', '제주'], PLACES + ['기타'], DAYS + ['월요일']),
+        '2023': lambda rng: random_sheet(rng, 120, ['서울', '부산', '제주']),
+    })
+    regions = ['서울', '부산', '제주', '없는지역']
+    data = load(base)
+    query_all(data, regions)
+    data.append_workbook(extra, workers=1)
+    expected = load(merged)
+
+    for attribute in ['years', 'regions', 'days', 'places']:
+        assert getattr(data.cube, attribute) == getattr(expected.cube, attribute)
+    assert np.array_equal(data.cube.counts, expected.cube.counts)
+    assert data.forecast_year == expected.forecast_year == 2024
+    assert_close(query_all(data, regions), query_all(expected, regions))
+    assert_close(queries.compare_regions(data, '월', 8, 13, regions), queries.compare_regions(expected, '월', 8, 13, regions))
+    for year in expected.years:
+        assert len(data.rows('제주', '월', year)) == len(expected.rows('제주', '월', year))
+
+# 연도가 그대로면 새 행이 있는 지역의 결과만 캐시에서 제거
+def test_append_invalidates_only_appended_regions(tmp_path):
+    base, extra, merged = append_workbooks(tmp_path, {'2022': lambda rng: random_sheet(rng, 60, ['부산'])})
+    data = load(base)
+    query_all(data, ['서울', '부산'])
+    regions_before = {key[0] for key in data.result_cache.entries}
+    kept = {key: value for key, value in data.result_cache.entries.items() if key[0] == '서울'}
+    data.append_workbook(extra, workers=1)
+
+    assert regions_before == {'서울', '부산'}
+    assert dict(data.result_cache.entries) == kept
+    assert_close(query_all(data, ['서울', '부산']), query_all(load(merged), ['서울', '부산']))
@@ -0,0 +1,39 @@
+import os
+import pytest
+
+pytest.importorskip('PyQt5')
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PyQt5.QtWidgets import QApplication
+from query_runner import QueryRunner
+
+
+@pytest.fixture(scope='module')
+def app():
+    return QApplication.instance() or QApplication([])
+
+# 작업 스레드를 거치지 않고 완료 시그널의 슬롯을 직접 호출
+def finish(runner, on_result, on_error):
+    runner.query_id += 1
+    runner.callbacks = (on_result, None, on_error)
+    runner.start_time = 0.0
+    runner._on_finished(runner.query_id, ['결과'])
+
+def test_render_error_goes_to_on_error(app):
+    errors = []
+    def on_result(results):
+        raise ValueError('표시 실패')
+    finish(QueryRunner(), on_result, errors.append)
+    assert errors == ['표시 실패']
+
+def test_render_error_without_on_error(app):
+    def on_result(results):
+        raise ValueError('표시 실패')
+    finish(QueryRunner(), on_result, None)
+
+def test_result_is_rendered_once(app):
+    results, errors = [], []
+    runner = QueryRunner()
+    finish(runner, results.append, errors.append)
+    runner._on_finished(runner.query_id, ['다시'])
+    assert results == [['결과']] and errors == []
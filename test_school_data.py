@@ -0,0 +1,72 @@
+import pickle
+import threading
+from school_data import ResultCache
+
+
+def size(value):
+    return len(pickle.dumps(value))
+
+def fill(cache, keys):
+    for key in keys:
+        cache.get_or_compute(key, lambda: key * 10)
+
+def test_hits_and_misses():
+    cache = ResultCache(1024)
+    calls = []
+    for _ in range(3):
+        assert cache.get_or_compute(('서울', 1), lambda: calls.append(1) or [1, 2]) == [1, 2]
+    assert calls == [1]
+    assert (cache.hits, cache.misses) == (2, 1)
+    assert cache.summary().startswith('캐시 적중 2회 / 미적중 1회 (1개')
+
+# 한도를 넘으면 가장 오래 쓰지 않은 결과부터 제거
+def test_lru_eviction():
+    keys = [('서울', i) for i in range(4)]
+    cache = ResultCache(3 * size(keys[0] * 10))
+    fill(cache, keys[:3])
+    cache.get_or_compute(keys[0], lambda: None)
+    fill(cache, keys[3:])
+    assert list(cache.entries) == [keys[2], keys[0], keys[3]]
+    assert cache.total_bytes == sum(size(key * 10) for key in cache.entries) <= cache.max_bytes
+
+def test_value_larger_than_limit_is_not_stored():
+    cache = ResultCache(10)
+    assert cache.get_or_compute(('서울',), lambda: list(range(100))) == list(range(100))
+    assert not cache.entries and cache.total_bytes == 0
+
+def test_disabled_cache_counts_misses():
+    cache = ResultCache(0)
+    calls = []
+    for _ in range(2):
+        cache.get_or_compute(('서울',), lambda: calls.append(1))
+    assert len(calls) == 2 and (cache.hits, cache.misses) == (0, 2) and not cache.entries
+
+def test_clear_and_invalidate():
+    cache = ResultCache(1024)
+    fill(cache, [('서울', 1), ('부산', 1), ('서울', 2), ('제주', 1)])
+    cache.invalidate({'서울', '없는지역'})
+    assert list(cache.entries) == [('부산', 1), ('제주', 1)]
+    assert cache.total_bytes == size(('부산', 1) * 10) + size(('제주', 1) * 10)
+    cache.clear()
+    assert not cache.entries and cache.total_bytes == 0
+
+# 계산하는 동안 무효화되면 (이전 데이터로 계산했을 수 있으므로) 결과를 저장하지 않음
+def test_result_computed_across_invalidation_is_not_stored():
+    for invalidate in [lambda cache: cache.invalidate({'부산'}), lambda cache: cache.clear()]:
+        cache = ResultCache(1024)
+        def compute():
+            invalidate(cache)
+            return 1
+        assert cache.get_or_compute(('서울',), compute) == 1
+        assert not cache.entries
+        assert cache.get_or_compute(('서울',), lambda: 2) == 2
+
+def test_counters_under_threads():
+    for max_bytes in [0, 1024]:
+        cache = ResultCache(max_bytes)
+        threads = [threading.Thread(target=fill, args=(cache, [('서울', i % 5) for i in range(200)])) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert cache.hits + cache.misses == 8 * 200